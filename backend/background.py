@@ -0,0 +1,167 @@
+"""
+Debounced background jobs.
+
+A job runs on its own thread in the worker process. Triggers that arrive
+while a run is pending are coalesced into that run, and runs are spaced at
+least ``min_interval`` seconds apart unless a caller asks for an immediate
+run (e.g. from the admin API). With a ``shared`` store (a SharedVersion or
+DatabaseVersion) the last run is recorded there, so every worker reports
+it, not just the one that ran the job.
+
+The spacing holds across processes too when the job also has a ``lock``
+(e.g. ``migrations.process_lock``). Under it a worker reads when any worker
+last started the job. A run started after this worker's trigger already
+covers it, so the trigger is dropped. A run started within ``min_interval``
+pushes this one back until the interval is over. Otherwise the start is
+recorded and the job runs, still holding the lock.
+"""
+import contextlib
+import json
+import threading
+import time
+import traceback
+from datetime import datetime
+
+
+class DebouncedJob:
+    def __init__(self, name, fn, min_interval, shared=None, lock=None):
+        # lock() returns a context manager held by one process at a time; needs shared
+        self.name = name
+        self._shared = shared
+        self._lock = lock
+        self._fn = fn
+        self._min_interval = min_interval
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pending = False
+        self._pending_since = None
+        self._immediate = False
+        self._running = False
+        self._last_started = None
+        self.triggers = 0
+        self.coalesced = 0
+        self.runs = 0
+        self.skipped = 0
+        self.last_run_at = None
+        self.last_duration_ms = None
+        self.last_result = None
+        self.last_error = None
+
+    def trigger(self, immediate=False):
+        with self._cond:
+            self.triggers += 1
+            if self._pending:
+                self.coalesced += 1
+            else:
+                self._pending_since = datetime.utcnow()
+            self._pending = True
+            self._immediate = self._immediate or immediate
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                if not self._immediate and self._last_started is not None:
+                    wait_for = self._last_started + self._min_interval - time.monotonic()
+                    if wait_for > 0:
+                        # Sleep out the interval; more triggers just fold into this run
+                        self._cond.wait(wait_for)
+                        continue
+                immediate = self._immediate
+                pending_since = self._pending_since
+                self._pending = False
+                self._immediate = False
+                self._running = True
+                self._last_started = time.monotonic()
+
+            with self._lock() if self._lock is not None else contextlib.nullcontext():
+                started_at = self._claim(immediate, pending_since)
+                if started_at is not None:
+                    self._run(started_at)
+            with self._cond:
+                self._running = False
+
+    def _claim(self, immediate, pending_since):
+        # Called under the lock: the start time to run with, or None when another
+        # worker's run covers this trigger or started less than min_interval ago
+        started_at = datetime.utcnow()
+        if self._lock is None or self._shared is None:
+            return started_at
+        try:
+            shared = json.loads(self._shared.load() or '{}')
+            last_run_at = shared.get('last_run_at')
+            last_started = datetime.fromisoformat(last_run_at) if last_run_at else None
+            if last_started is not None and not immediate:
+                if last_started >= pending_since:
+                    # Started after the trigger, so it already saw whatever caused it
+                    with self._cond:
+                        self.skipped += 1
+                    return None
+                wait_for = self._min_interval - (started_at - last_started).total_seconds()
+                if wait_for > 0:
+                    with self._cond:
+                        self.skipped += 1
+                        # Pending again from the earliest trigger, due when the interval is over
+                        self._pending_since = pending_since
+                        self._pending = True
+                        self._last_started = time.monotonic() + wait_for - self._min_interval
+                    return None
+            # Recorded before running, so workers waiting on the lock see it
+            self._shared.store(json.dumps(dict(shared, last_run_at=started_at.isoformat())))
+        except Exception as e:
+            print(f"Could not read the last {self.name} run, running anyway: {e}")
+        return started_at
+
+    def _run(self, started_at):
+        began = time.perf_counter()
+        try:
+            result, error = self._fn(), None
+        except Exception as e:
+            result, error = None, f'{e}\n{traceback.format_exc()}'
+        duration_ms = round((time.perf_counter() - began) * 1000, 2)
+
+        with self._cond:
+            self.runs += 1
+            self.last_run_at = started_at
+            self.last_duration_ms = duration_ms
+            self.last_result = result
+            self.last_error = error
+
+        if self._shared is not None:
+            try:
+                self._shared.store(json.dumps(self._last_run()))
+            except Exception as e:
+                print(f"Could not record the last {self.name} run: {e}")
+
+    def _last_run(self):
+        return {
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_duration_ms': self.last_duration_ms,
+            'last_result': self.last_result,
+            'last_error': self.last_error
+        }
+
+    def status(self):
+        # Counters are this worker's; the last run is the latest of any worker when shared
+        with self._cond:
+            status = {
+                'name': self.name,
+                'pending': self._pending,
+                'running': self._running,
+                'min_interval_seconds': self._min_interval,
+                'triggers': self.triggers,
+                'coalesced': self.coalesced,
+                'runs': self.runs,
+                'skipped': self.skipped,
+                **self._last_run()
+            }
+        if self._shared is not None:
+            payload = self._shared.load()
+            if payload:
+                status.update(json.loads(payload))
+        return status
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Leaderboard benchmark: per-user queries (old) vs one aggregated query (new)
+
+Seeds N participants with Round 1 and Round 2 results and times both ways of
+building the leaderboard, checking that they produce the same ranking. The app
+now serves a materialized leaderboard; the aggregated query is kept here as
+the reference it was checked against. It then times repositioning one user
+after a score write in a view of 1,000 to 1,000,000 users, in a flat list
+kept sorted with bisect and in the blocked SortedKeys the views use.
+
+It uses a throwaway in-memory SQLite database unless DATABASE_URL is set.
+NOTE: seeding deletes every participant, so never point DATABASE_URL at a
+live contest database.
+
+Usage:
+python bench_leaderboard.py [N ...]      (default: 100 1000 10000)
+"""
+import bisect
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from werkzeug.security import generate_password_hash
+
+from app import app, db, User, QuizResult, UserScore
+from leaderboard import SortedKeys
+
+
+def legacy_leaderboard(round_filter=None, is_admin=False):
+    # The original implementation: one UserScore and one QuizResult query per user
+    leaderboard_data = []
+    for user in User.query.filter_by(is_admin=False).all():
+        query = UserScore.query.filter_by(user_id=user.id)
+        if round_filter:
+            query = query.filter_by(round_number=round_filter)
+        elif not is_admin:
+            query = query.filter(UserScore.round_number != 3)
+        scores = query.all()
+        if not scores:
+            continue
+
+        results = QuizResult.query.filter_by(user_id=user.id)
+        if round_filter:
+            results = results.filter_by(round_number=round_filter)
+        elif not is_admin:
+            results = results.filter(QuizResult.round_number != 3)
+
+        leaderboard_data.append({
+            'user_id': user.id,
+            'total_score': sum(score.total_score for score in scores),
+            'total_questions': sum(result.total_questions for result in results.all()),
+            'latest_completion': max(score.completion_time for score in scores)
+        })
+    leaderboard_data.sort(key=lambda x: (-x['total_score'], x['latest_completion']))
+    return leaderboard_data
+
+
+def aggregated_leaderboard(round_filter=None, is_admin=False):
+    # One aggregated query, what the leaderboard was built with before it was materialized
+    score_filters = []
+    result_filters = []
+    if round_filter:
+        score_filters.append(UserScore.round_number == round_filter)
+        result_filters.append(QuizResult.round_number == round_filter)
+    elif not is_admin:
+        # For non-admins, exclude Round 3 scores
+        score_filters.append(UserScore.round_number != 3)
+        result_filters.append(QuizResult.round_number != 3)
+    
+    score_totals = db.session.query(
+        UserScore.user_id.label('user_id'),
+        db.func.sum(UserScore.total_score).label('total_score'),
+        db.func.sum(UserScore.raw_score).label('raw_score'),
+        db.func.sum(UserScore.penalty_points).label('penalty_points'),
+        db.func.max(UserScore.completion_time).label('latest_completion')
+    ).filter(*score_filters).group_by(UserScore.user_id).subquery()
+    
+    question_totals = db.session.query(
+        QuizResult.user_id.label('user_id'),
+        db.func.sum(QuizResult.total_questions).label('total_questions')
+    ).filter(*result_filters).group_by(QuizResult.user_id).subquery()
+    
+    # Inner join on scores: only users with at least one score are ranked
+    rows = db.session.query(
+        User.id,
+        User.username,
+        User.enrollment_no,
+        User.current_round,
+        User.qualified_for_round3,
+        score_totals.c.total_score,
+        score_totals.c.raw_score,
+        score_totals.c.penalty_points,
+        score_totals.c.latest_completion,
+        db.func.coalesce(question_totals.c.total_questions, 0).label('total_questions')
+    ).join(
+        score_totals, score_totals.c.user_id == User.id
+    ).outerjoin(
+        question_totals, question_totals.c.user_id == User.id
+    ).filter(
+        User.is_admin == False
+    ).order_by(
+        # Earlier submissions rank higher on equal scores
+        score_totals.c.total_score.desc(),
+        score_totals.c.latest_completion.asc(),
+        User.id.asc()
+    ).all()
+    
+    leaderboard_data = []
+    for row in rows:
+        total_questions = row.total_questions
+        leaderboard_data.append({
+            'user_id': row.id,
+            'username': row.username,
+            'enrollment_no': row.enrollment_no,
+            'total_score': row.total_score,
+            'raw_score': row.raw_score,
+            'penalty_points': row.penalty_points,
+            'total_questions': total_questions,
+            'percentage': round((row.total_score / total_questions * 100), 2) if total_questions > 0 else 0,
+            'current_round': row.current_round,
+            'qualified_for_round3': row.qualified_for_round3,
+            'latest_completion': row.latest_completion
+        })
+    return leaderboard_data
+
+
+def seed(participants):
+    db.session.query(UserScore).delete()
+    db.session.query(QuizResult).delete()
+    db.session.query(User).filter(User.is_admin == False).delete()
+    db.session.commit()
+
+    # Hash once, the benchmark is about the leaderboard not about logins
+    password = generate_password_hash('benchmark')
+    start = datetime.utcnow()
+    users = [
+        User(enrollment_no=f'B{i:011d}', username=f'bench_{i}', password=password, is_admin=False)
+        for i in range(participants)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+
+    rows = []
+    for i, user in enumerate(users):
+        for round_number in (1, 2):
+            score = (i * 7 + round_number * 3) % 21
+            completed = start + timedelta(seconds=(i * 13 + round_number) % 3600)
+            rows.append(QuizResult(user_id=user.id, round_number=round_number, language='python',
+                                   score=score, total_questions=20, completed_at=completed))
+            rows.append(UserScore(user_id=user.id, round_number=round_number, raw_score=score,
+                                  penalty_points=0, total_score=score, completion_time=completed))
+    db.session.add_all(rows)
+    db.session.commit()
+
+
+def reposition_times(ranked, writes=20000):
+    # Microseconds per score write: take the user's key out and put the new one in
+    writes = min(writes, ranked)
+    keys = list(range(0, 2 * ranked, 2))
+    moves = [(user * 2, random.randrange(ranked) * 2 + 1) for user in random.sample(range(ranked), writes)]
+    flat = list(keys)
+    began = time.perf_counter()
+    for old, new in moves:
+        del flat[bisect.bisect_left(flat, old)]
+        bisect.insort(flat, new)
+    flat_us = (time.perf_counter() - began) / writes * 1e6
+    blocked = SortedKeys(keys)
+    began = time.perf_counter()
+    for old, new in moves:
+        blocked.remove(old)
+        blocked.add(new)
+    blocked_us = (time.perf_counter() - began) / writes * 1e6
+    assert blocked.slice(0, ranked) == flat, 'orders differ'
+    return flat_us, blocked_us
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.expire_all()
+        began = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+    with app.app_context():
+        print(f"{'participants':>12} {'per-user (ms)':>14} {'aggregated (ms)':>16} {'speedup':>8}")
+        for participants in sizes:
+            seed(participants)
+            repeat = 3 if participants <= 1000 else 1
+            old_time, old = timed(legacy_leaderboard, repeat)
+            new_time, new = timed(aggregated_leaderboard, repeat)
+            assert [e['user_id'] for e in old] == [e['user_id'] for e in new], 'rankings differ'
+            assert [e['total_questions'] for e in old] == [e['total_questions'] for e in new]
+            print(f"{participants:>12} {old_time * 1000:>14.1f} {new_time * 1000:>16.1f} {old_time / new_time:>7.1f}x")
+
+        print(f"\n{'ranked users':>12} {'flat list (us)':>14} {'SortedKeys (us)':>16}")
+        for ranked in (1000, 10000, 100000, 1000000):
+            flat_us, blocked_us = reposition_times(ranked)
+            print(f"{ranked:>12} {flat_us:>14.2f} {blocked_us:>16.2f}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Login benchmark: POST /api/login throughput on one core
+
+Creates a participant whose password is hashed with each method below, then
+times logins through the Flask test client in this single process, so the
+numbers are logins/second per core (multiply by workers for a server).
+Prints password logins at werkzeug's default cost, at a cheaper configured
+PARTICIPANT_HASH_METHOD, and session token logins, which skip the password
+check entirely.
+
+It uses a temporary SQLite database unless DATABASE_URL is set.
+
+Usage:
+python bench_login.py [SECONDS] [CHEAP_METHOD]      (default: 5 pbkdf2:sha256:50000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+directory = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(directory, 'login.db'))
+os.environ.setdefault('SECRET_KEY', 'bench-login')
+
+from werkzeug.security import generate_password_hash
+
+from app import app, db, User
+
+
+def participant(enrollment_no, method):
+    with app.app_context():
+        user = User.query.filter_by(enrollment_no=enrollment_no).first()
+        if user is None:
+            user = User(enrollment_no=enrollment_no, username=f'bench_login_{enrollment_no}', is_admin=False)
+            db.session.add(user)
+        user.password = generate_password_hash('secret', method)
+        db.session.commit()
+
+
+def rate(client, body, seconds):
+    count = 0
+    began = time.perf_counter()
+    while time.perf_counter() - began < seconds:
+        response = client.post('/api/login', json=body)
+        assert response.status_code == 200, response.get_json()
+        count += 1
+    return count / (time.perf_counter() - began), response.get_json()
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cheap_method = sys.argv[2] if len(sys.argv) > 2 else 'pbkdf2:sha256:50000'
+    client = app.test_client()
+
+    results = []
+    for enrollment_no, method in (('900000000001', 'pbkdf2'), ('900000000002', cheap_method)):
+        # The policy matches the stored hash, so logins never rehash mid-benchmark
+        app.config['PARTICIPANT_HASH_METHOD'] = method
+        participant(enrollment_no, method)
+        per_second, data = rate(client, {'enrollment_no': enrollment_no, 'password': 'secret'}, seconds)
+        results.append((f'password, {method}', per_second))
+
+    per_second, _ = rate(client, {'token': data['token']}, seconds)
+    results.append(('session token', per_second))
+
+    print(f"{'login':>40} {'logins/s per core':>18}")
+    for name, per_second in results:
+        print(f"{name:>40} {per_second:>18.1f}")
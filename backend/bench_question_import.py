@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Question import benchmark: questions per second through the bulk import API
+
+Posts COUNT generated questions to /api/admin/questions/import as NDJSON and
+as a JSON array, and compares that with adding the same number one at a time
+through the single-question endpoint (each one its own insert and version
+bump). It then times streaming the bank back out through the export endpoint.
+
+It uses a temporary SQLite database unless DATABASE_URL is set.
+
+Usage:
+python bench_question_import.py [COUNT]      (default: 5000)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+directory = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(directory, 'questions.db'))
+os.environ.setdefault('SECRET_KEY', 'bench-question-import')
+
+from app import User, _session_token, app, question_store
+
+SINGLE_ADDS = 500
+
+
+def question(number):
+    return {'question': f'What does snippet {number} print?',
+            'code': f'print({number} % 4)',
+            'options': ['0', '1', '2', '3'], 'correctAnswer': number % 4}
+
+
+def timed(fn):
+    began = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - began
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    client = app.test_client()
+    with app.app_context():
+        admin = User.query.filter_by(is_admin=True).first()
+        admin_id = admin.id
+        # Admin endpoints require a session token
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {_session_token(admin)}'
+    questions = [question(number) for number in range(count)]
+    bodies = {
+        'ndjson': ('\n'.join(json.dumps(q) for q in questions).encode('utf-8'), 'application/x-ndjson'),
+        'json': (json.dumps(questions, indent=2).encode('utf-8'), 'application/json')
+    }
+
+    print(f"{'method':>24} {'questions':>10} {'seconds':>10} {'questions/s':>12}")
+    for fmt, (body, mimetype) in bodies.items():
+        question_store.replace('round3', [])
+        response, seconds = timed(lambda: client.post(
+            f'/api/admin/questions/import?admin_id={admin_id}&bank=round3', data=body, content_type=mimetype
+        ))
+        imported = response.get_json()['imported']
+        print(f"{'import ' + fmt:>24} {imported:>10} {seconds:>10.3f} {imported / seconds:>12.0f}")
+
+    question_store.replace('round3', [])
+    _, seconds = timed(lambda: [client.post('/api/admin/questions/round3', json=q) for q in questions[:SINGLE_ADDS]])
+    print(f"{'one at a time':>24} {SINGLE_ADDS:>10} {seconds:>10.3f} {SINGLE_ADDS / seconds:>12.0f}")
+
+    question_store.replace('round3', [])
+    client.post(f'/api/admin/questions/import?admin_id={admin_id}&bank=round3',
+                data=bodies['ndjson'][0], content_type='application/x-ndjson')
+    for fmt in ('ndjson', 'json'):
+        response, seconds = timed(lambda: client.get(
+            f'/api/admin/questions/export?admin_id={admin_id}&bank=round3&format={fmt}'
+        ).get_data())
+        print(f"{'export ' + fmt:>24} {count:>10} {seconds:>10.3f} {count / seconds:>12.0f}")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Question store benchmark: cost of one admin edit as the bank grows
+
+For each bank size, times adding and deleting one question the way the admin
+endpoints used to (read the whole JSON file, change it, json.dump it back
+with indent=2) and through the QuestionStore (one row insert or delete and a
+version bump). It also times the first read of the bank after a write,
+which every worker pays once per edit.
+
+It uses a temporary SQLite database unless DATABASE_URL is set.
+
+Usage:
+python bench_question_store.py [SIZES]      (default: 100,1000,10000)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+directory = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(directory, 'questions.db'))
+os.environ.setdefault('SECRET_KEY', 'bench-question-store')
+
+from app import question_bank, question_store
+
+ROUNDS = 50
+
+
+def question(question_id):
+    return {'id': question_id, 'question': f'What does snippet {question_id} print?',
+            'options': ['1', '2', '3', '4'], 'correctAnswer': (question_id or 0) % 4}
+
+
+def per_call(fn):
+    began = time.perf_counter()
+    for i in range(ROUNDS):
+        fn(i)
+    return (time.perf_counter() - began) / ROUNDS * 1000
+
+
+def file_add(path, i):
+    with open(path) as file:
+        questions = json.load(file)
+    questions.append(question(max(q['id'] for q in questions) + 1))
+    questions.sort(key=lambda x: x['id'])
+    with open(path, 'w') as file:
+        json.dump(questions, file, indent=2)
+
+
+def file_delete(path, i):
+    with open(path) as file:
+        questions = json.load(file)
+    questions.pop()
+    with open(path, 'w') as file:
+        json.dump(questions, file, indent=2)
+
+
+if __name__ == '__main__':
+    sizes = [int(size) for size in (sys.argv[1] if len(sys.argv) > 1 else '100,1000,10000').split(',')]
+    bank = 'python'
+    question_store.banks[bank] = os.path.join(directory, 'bank.json')
+
+    print(f"{'questions':>10} {'file add':>10} {'file del':>10} {'store add':>10} {'store del':>10} {'reload':>10}   (ms)")
+    for size in sizes:
+        path = question_store.banks[bank]
+        with open(path, 'w') as file:
+            json.dump([question(i) for i in range(1, size + 1)], file, indent=2)
+        question_store.import_file(bank)
+
+        file_add_ms = per_call(lambda i: file_add(path, i))
+        file_delete_ms = per_call(lambda i: file_delete(path, i))
+        added = []
+        store_add_ms = per_call(lambda i: added.append(question_store.add(bank, question(None))['id']))
+        store_delete_ms = per_call(lambda i: question_store.delete(bank, added[i]))
+        reload_ms = per_call(lambda i: (question_store.add(bank, question(None)), question_bank.get(bank))) - store_add_ms
+
+        print(f"{size:>10} {file_add_ms:>10.2f} {file_delete_ms:>10.2f} {store_add_ms:>10.2f} "
+              f"{store_delete_ms:>10.2f} {reload_ms:>10.2f}")
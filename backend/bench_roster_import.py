@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Roster import benchmark: POST /api/admin/participants/import with a large file
+
+Writes an N-row CSV roster (with a few duplicate and invalid rows), uploads it
+to the import endpoint as a multipart file and reads the streamed report back
+row by row. Prints rows/second and how much the process grew, which should
+stay flat no matter how large the file is.
+
+Password hashing dominates a real import, so by default the benchmark hashes
+with a cheap method (PARTICIPANT_HASH_METHOD, default pbkdf2:sha256:1000) to measure
+the import pipeline itself, and separately prints what hashing every row
+with werkzeug's default method would add.
+
+It uses a temporary SQLite database unless DATABASE_URL is set.
+
+Usage:
+python bench_roster_import.py [N]      (default: 50000)
+"""
+import csv
+import os
+import resource
+import sys
+import tempfile
+import time
+
+directory = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(directory, 'import.db'))
+os.environ.setdefault('PARTICIPANT_HASH_METHOD', 'pbkdf2:sha256:1000')
+os.environ.setdefault('SECRET_KEY', 'bench-roster-import')
+
+from werkzeug.security import generate_password_hash
+
+from app import app, User, _session_token
+
+
+def write_roster(path, count):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['enrollment_no', 'username', 'password'])
+        for i in range(count):
+            if i and i % 1000 == 0:
+                # Repeat an earlier participant and add an incomplete row
+                writer.writerow([f'9{i - 1:011d}', f'bench_{i - 1}', 'secret'])
+                writer.writerow([f'9{i:011d}', '', 'secret'])
+            writer.writerow([f'9{i:011d}', f'bench_{i}', f'secret{i}'])
+
+
+def max_rss_mb():
+    # Linux reports KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    roster_path = os.path.join(directory, 'roster.csv')
+    write_roster(roster_path, count)
+    size_mb = os.path.getsize(roster_path) / 1024 / 1024
+
+    with app.app_context():
+        admin = User.query.filter_by(is_admin=True).first()
+        token = _session_token(admin)
+
+    client = app.test_client()
+    rss_before = max_rss_mb()
+    began = time.perf_counter()
+    statuses = {}
+    summary = None
+    with open(roster_path, 'rb') as roster:
+        response = client.post(
+            '/api/admin/participants/import',
+            data={'file': (roster, 'roster.csv')},
+            headers={'Authorization': f'Bearer {token}'},
+            content_type='multipart/form-data',
+            buffered=False
+        )
+        first_result_at = None
+        for line in response.response:
+            for part in line.splitlines():
+                if first_result_at is None:
+                    first_result_at = time.perf_counter()
+                if part.startswith(b'{"summary"'):
+                    summary = part
+                elif part.strip():
+                    status = part.split(b'"status": "', 1)[1].split(b'"', 1)[0].decode()
+                    statuses[status] = statuses.get(status, 0) + 1
+        response.close()
+    elapsed = time.perf_counter() - began
+
+    with app.app_context():
+        stored = User.query.filter(User.username.like('bench_%')).count()
+
+    hash_began = time.perf_counter()
+    for _ in range(3):
+        generate_password_hash('secret')
+    default_hash_seconds = (time.perf_counter() - hash_began) / 3
+    rows = sum(statuses.values())
+
+    print(f"roster: {rows} rows, {size_mb:.1f} MB, hash method {os.environ['PARTICIPANT_HASH_METHOD']}")
+    print(f"results: {statuses}, {stored} accounts stored")
+    print(f"first result after {(first_result_at - began) * 1000:.0f} ms, "
+          f"all {rows} in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+    print(f"peak RSS grew by {max_rss_mb() - rss_before:.1f} MB")
+    print(f"werkzeug default hashing would add {default_hash_seconds * statuses.get('created', 0):.0f}s "
+          f"per hashing process ({default_hash_seconds * 1000:.0f} ms per account)")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Cold start benchmark: worker boot time against databases of different sizes
+
+For each roster size N, fills a fresh SQLite file with N participants (and a
+Round 1 result each), then times how long a new process takes to import the
+app, which is what every gunicorn worker does when it boots or is recycled.
+Boot time should not depend on N. For comparison it also prints what the old
+startup (drop every table, re-hash every participant password) would cost.
+
+Each size gets its own temporary database, so it never touches the contest
+database.
+
+Usage:
+python bench_startup.py [N ...]      (default: 0 1000 10000)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BOOT_SAMPLES = 3
+
+SEED = """
+from werkzeug.security import generate_password_hash
+from app import app, db, User, QuizResult
+count = int(COUNT)
+with app.app_context():
+    password = generate_password_hash('startup')
+    db.session.add_all([
+        User(enrollment_no=f'S{i:011d}', username=f'startup_{i}', password=password, is_admin=False)
+        for i in range(count)
+    ])
+    db.session.flush()
+    ids = [row.id for row in User.query.filter(User.is_admin == False)]
+    db.session.add_all([
+        QuizResult(user_id=user_id, round_number=1, language='python', score=10, total_questions=20)
+        for user_id in ids
+    ])
+    db.session.commit()
+"""
+
+BOOT = """
+import time
+began = time.perf_counter()
+import app
+print('BOOT_MS', (time.perf_counter() - began) * 1000)
+"""
+
+
+def run(code, database_url):
+    env = dict(os.environ, DATABASE_URL=database_url)
+    return subprocess.run(
+        [sys.executable, '-c', code], env=env, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+
+
+def hash_seconds():
+    from werkzeug.security import generate_password_hash
+    began = time.perf_counter()
+    generate_password_hash('startup')
+    return time.perf_counter() - began
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [0, 1000, 10000]
+    per_hash = hash_seconds()
+
+    print(f"{'participants':>12} {'boot (ms)':>10} {'old boot, hashing only (s)':>27}")
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = 'sqlite:///' + os.path.join(directory, 'startup.db')
+            seeded = run(SEED.replace('COUNT', str(count)), database_url)
+            if seeded.returncode != 0:
+                print(f"{count:>12} seeding failed:\n{seeded.stderr[-2000:]}")
+                continue
+            samples = []
+            for _ in range(BOOT_SAMPLES):
+                output = run(BOOT, database_url).stdout
+                line = next((l for l in output.splitlines() if l.startswith('BOOT_MS ')), None)
+                if line:
+                    samples.append(float(line.split()[1]))
+            if not samples:
+                print(f"{count:>12} boot failed")
+                continue
+            print(f"{count:>12} {min(samples):>10.1f} {count * per_hash:>27.1f}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Debounced job check: workers sharing a store run the job once per interval
+
+Creates two DebouncedJob instances, standing in for two gunicorn workers,
+that share one SharedVersion store and one process_lock lock file. Then:
+- both are triggered at the same moment, which must give a single run;
+- both are triggered continuously for a few intervals, and the runs must
+  start at least min_interval apart, with no two running at once;
+- the last trigger must still be followed by a run that started after it.
+Exits non-zero if any check fails.
+
+It only uses a temporary directory and an in-memory SQLite engine.
+
+Usage:
+python check_debounced_job.py [MIN_INTERVAL]      (default: 0.5)
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+from background import DebouncedJob
+from migrations import process_lock
+from shared_version import SharedVersion
+
+
+class Recorder:
+    def __init__(self, duration):
+        self.duration = duration
+        self.starts = []
+        self.overlaps = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.starts.append(time.monotonic())
+            self._active += 1
+            self.overlaps += self._active > 1
+        time.sleep(self.duration)
+        with self._lock:
+            self._active -= 1
+        return True
+
+
+def check(name, ok, detail=''):
+    print(f"{'ok' if ok else 'FAILED':>9}  {name}" + (f" ({detail})" if detail else ''))
+    return ok
+
+
+def settle(jobs, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not any(job.status()['pending'] or job.status()['running'] for job in jobs):
+            return
+        time.sleep(0.02)
+
+
+if __name__ == '__main__':
+    min_interval = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    directory = tempfile.mkdtemp()
+    engine = create_engine('sqlite://')
+    shared_path = os.path.join(directory, 'job.version')
+    lock_path = os.path.join(directory, 'job.lock')
+    recorder = Recorder(duration=min_interval / 5)
+    jobs = [
+        DebouncedJob(f'worker-{i}', recorder, min_interval, shared=SharedVersion(shared_path),
+                     lock=lambda: process_lock(engine, lock_path, 1))
+        for i in range(2)
+    ]
+    results = []
+
+    for job in jobs:
+        job.trigger()
+    settle(jobs)
+    results.append(check('simultaneous triggers on two workers run once', len(recorder.starts) == 1,
+                         f'{len(recorder.starts)} runs'))
+
+    began = time.monotonic()
+    last_trigger = None
+    while time.monotonic() - began < min_interval * 4:
+        for job in jobs:
+            job.trigger()
+        last_trigger = time.monotonic()
+        time.sleep(min_interval / 20)
+    settle(jobs)
+    gaps = [later - earlier for earlier, later in zip(recorder.starts, recorder.starts[1:])]
+    # Shared start times have microsecond resolution, allow for the rounding
+    results.append(check('runs start at least min_interval apart', min(gaps) >= min_interval - 0.01,
+                         f'{len(recorder.starts)} runs, shortest gap {min(gaps):.3f}s'))
+    results.append(check('no two runs at once', recorder.overlaps == 0))
+    results.append(check('the last trigger is followed by a run', recorder.starts[-1] >= last_trigger))
+    runs = sum(job.status()['runs'] for job in jobs)
+    results.append(check('each run is counted by the worker that ran it', runs == len(recorder.starts)))
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Event pump check: a failing broker read must not stop live events
+
+Runs an EventHub over a FileBroker whose end() and read_since() each raise
+once, the way a locked database or a segment rotated away mid-read would.
+Events published before and after the failures must still reach a
+subscriber. Then it kills the pump thread outright and checks that the
+next subscribe() starts a new one. Exits non-zero if an event is lost.
+
+It only uses a temporary directory; no app or database is involved.
+
+Usage:
+python check_event_pump.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from events import EventHub, FileBroker
+
+
+class FlakyBroker:
+    """A broker whose named methods raise on their first call."""
+
+    def __init__(self, broker, failing=('end', 'read_since')):
+        self._broker = broker
+        self.failing = set(failing)
+
+    def __getattr__(self, name):
+        method = getattr(self._broker, name)
+        if name not in self.failing:
+            return method
+
+        def fail_once(*args, **kwargs):
+            self.failing.discard(name)
+            raise OSError(f'{name} failed')
+        return fail_once
+
+
+def receive(subscriber, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    received = []
+    while len(received) < count and time.monotonic() < deadline:
+        item = subscriber.get(0.05)
+        if item is not None:
+            received.append(item[1]['data'])
+    return received
+
+
+def check(name, ok):
+    print(f"{'ok' if ok else 'FAILED':>9}  {name}")
+    return ok
+
+
+if __name__ == '__main__':
+    broker = FlakyBroker(FileBroker(os.path.join(tempfile.mkdtemp(), 'events.log')), failing=())
+    hub = EventHub(broker, poll_interval=0.01)
+    subscriber = hub.subscribe(user_id=1)
+    results = []
+
+    broker.failing = {'end', 'read_since'}
+    hub.publish('round_access', 1)
+    results.append(check('event published while the broker fails is delivered', receive(subscriber, 1) == [1]))
+    hub.publish('round_access', 2)
+    results.append(check('later events are delivered', receive(subscriber, 1) == [2]))
+    results.append(check('both failures were counted', hub.stats()['errors'] == 2))
+
+    # A pump that died anyway is replaced by the next subscriber, without losing its offset
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    hub._thread = dead
+    time.sleep(0.1)
+    hub.publish('round_access', 3)
+    second = hub.subscribe(user_id=1)
+    results.append(check('subscribe() restarts a dead pump', hub._thread is not dead and hub._thread.is_alive()))
+    results.append(check('events after the restart are delivered', receive(second, 1) == [3]))
+
+    sys.exit(0 if all(results) else 1)
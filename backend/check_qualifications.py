@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Qualification check: the per-user loop (old) and the ranking query (new) agree
+
+Seeds randomized rosters with Round 2 results and runs both ways of picking
+the Round 3 qualifiers: the original loop over every user and result, and
+_update_round_qualifications' single ranking query plus two bulk UPDATEs.
+Each roster mixes admins, users without a QuizResult, users with several
+UserScore rows, scores right at the 30% line, stale qualified flags, and
+ties in score and in score plus completion time around the top-10 cutoff.
+Exits non-zero if the qualified sets ever differ.
+
+It uses a throwaway in-memory SQLite database unless DATABASE_URL is set.
+NOTE: seeding deletes every participant, so never point DATABASE_URL at a
+live contest database.
+
+Usage:
+python check_qualifications.py [ROSTERS] [PARTICIPANTS]      (default: 30 60)
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from app import app, db, User, QuizResult, UserScore, _update_round_qualifications
+
+
+def legacy_qualifications(target_round=3, top_k=10):
+    # The original implementation: one User and one QuizResult query per scored user
+    previous_round = target_round - 1
+    user_scores = {}
+    for score in UserScore.query.filter_by(round_number=previous_round).all():
+        user_scores[score.user_id] = score
+
+    qualified_users = []
+    for user_id, score in user_scores.items():
+        user = User.query.get(user_id)
+        if not user or user.is_admin:
+            continue
+        result = QuizResult.query.filter_by(user_id=user_id, round_number=previous_round).first()
+        if not result:
+            continue
+        percentage = (score.total_score / result.total_questions) * 100
+        if percentage >= 30:
+            qualified_users.append({
+                'user_id': user_id,
+                'score': score.total_score,
+                'completion_time': score.completion_time
+            })
+    qualified_users.sort(key=lambda x: (-x['score'], x['completion_time']))
+    top_participants = qualified_users[:top_k]
+
+    for participant in top_participants:
+        User.query.get(participant['user_id']).qualified_for_round3 = True
+    for user in User.query.filter_by(is_admin=False).all():
+        if not any(p['user_id'] == user.id for p in top_participants):
+            user.qualified_for_round3 = False
+    db.session.commit()
+
+
+def seed(rng, participants):
+    db.session.query(UserScore).delete()
+    db.session.query(QuizResult).delete()
+    # Including the admins an earlier roster seeded
+    db.session.query(User).filter((User.is_admin == False) | User.username.like('qualify_%')).delete(synchronize_session=False)
+    db.session.commit()
+
+    users = [
+        User(enrollment_no=f'Q{i:011d}', username=f'qualify_{i}', password='-',
+             is_admin=rng.random() < 0.05, qualified_for_round3=rng.random() < 0.3)
+        for i in range(participants)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+
+    start = datetime.utcnow()
+    # A handful of completion times and scores, so ties are common around the cutoff
+    times = [start + timedelta(seconds=rng.randrange(0, 600, 60)) for _ in range(5)]
+    for user in users:
+        total_questions = rng.choice([10, 20, 20, 20])
+        # One user in ten has a score but no QuizResult and never qualifies
+        if rng.random() >= 0.1:
+            db.session.add(QuizResult(user_id=user.id, round_number=2, language=None,
+                                      score=0, total_questions=total_questions, completed_at=start))
+        # Exactly 30% is the lowest qualifying score
+        cutoff = total_questions * 30 // 100
+        score = rng.choice([cutoff - 1, cutoff, cutoff, 8, 9, 9, 10, 10, 12])
+        if rng.random() < 0.1:
+            # A user scored twice: only the later row counts
+            db.session.add(UserScore(user_id=user.id, round_number=2, raw_score=20, penalty_points=0,
+                                     total_score=20, completion_time=times[0]))
+            db.session.flush()
+            db.session.add(UserScore(user_id=user.id, round_number=2, raw_score=score, penalty_points=0,
+                                     total_score=score, completion_time=start + timedelta(hours=1)))
+        else:
+            db.session.add(UserScore(user_id=user.id, round_number=2, raw_score=score, penalty_points=0,
+                                     total_score=score, completion_time=rng.choice(times)))
+        db.session.flush()
+    db.session.commit()
+
+
+def qualified():
+    return {user.id for user in User.query.filter_by(qualified_for_round3=True, is_admin=False).all()}
+
+
+if __name__ == '__main__':
+    rosters = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    participants = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    failures = 0
+    with app.app_context():
+        app.config['ROUND3_QUALIFIERS'] = 10
+        for roster in range(rosters):
+            rng = random.Random(roster)
+            seed(rng, participants)
+            flags = {user.id: user.qualified_for_round3 for user in User.query.all()}
+
+            legacy_qualifications()
+            old = qualified()
+
+            # Same starting flags for the new implementation
+            for user in User.query.all():
+                user.qualified_for_round3 = flags[user.id]
+            db.session.commit()
+            assert _update_round_qualifications(3), 'qualification pass failed'
+            db.session.expire_all()
+            new = qualified()
+
+            status = 'ok' if old == new else 'DIFFERENT'
+            failures += old != new
+            print(f"{status:>9}  roster {roster}: {len(old)} qualified"
+                  + ('' if old == new else f", old only {sorted(old - new)}, new only {sorted(new - old)}"))
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Query plan check: hot lookups must use an index, not scan the whole table
+
+Runs EXPLAIN QUERY PLAN on the per-user and per-round lookups the request
+handlers make against QuizResult, UserScore and Round3Submission, and also
+checks that duplicate attempts and submissions are rejected by the unique
+indexes. Exits non-zero if any plan falls back to a full table scan.
+
+It uses a throwaway in-memory SQLite database unless DATABASE_URL is set, so
+it is safe to run next to a live contest database.
+
+Usage:
+python check_query_plans.py
+"""
+import os
+import re
+import sys
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy.exc import IntegrityError
+
+from app import app, db, User, QuizResult, UserScore, Round3Submission
+
+INDEXED_TABLES = ('quiz_result', 'user_score', 'round3_submission')
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(%s)\b(?! USING)' % '|'.join(INDEXED_TABLES))
+
+
+def hot_queries():
+    # Mirrors the filters in save_quiz_result, score_round3_submission,
+    # get_user_results, the Round 3 endpoints, the leaderboard and qualifications
+    latest_scores = db.session.query(
+        db.func.max(UserScore.id)
+    ).filter(UserScore.round_number == 2).group_by(UserScore.user_id)
+    return {
+        'round 3 result for user': QuizResult.query.filter_by(user_id=7, round_number=3),
+        'round 1 attempt for user': QuizResult.query.filter_by(user_id=7, round_number=1, language='python'),
+        'results for user': QuizResult.query.filter_by(user_id=7),
+        'submissions in round': QuizResult.query.filter_by(round_number=2).with_entities(db.func.count()),
+        'scores for user in round': UserScore.query.filter_by(user_id=7, round_number=2),
+        'round leaderboard totals': db.session.query(
+            UserScore.user_id, db.func.sum(UserScore.total_score)
+        ).filter(UserScore.round_number == 2).group_by(UserScore.user_id),
+        'latest score per user in round': latest_scores,
+        'challenge submitted by user': Round3Submission.query.filter_by(
+            user_id=7, challenge_id=3, track_type='dsa'
+        ),
+        'submissions for user and track': Round3Submission.query.filter_by(user_id=7, track_type='web'),
+    }
+
+
+def query_plan(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).all()
+    return [row[-1] for row in rows]
+
+
+def rejects_duplicate(*rows):
+    try:
+        for row in rows:
+            db.session.add(row)
+            db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return True
+    return False
+
+
+if __name__ == '__main__':
+    failures = 0
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            sys.exit('EXPLAIN QUERY PLAN is SQLite only; unset DATABASE_URL')
+
+        for label, query in hot_queries().items():
+            plan = query_plan(query)
+            scans = [line for line in plan if FULL_SCAN.search(line)]
+            status = 'FULL SCAN' if scans else 'ok'
+            failures += bool(scans)
+            print(f"{status:>9}  {label}: {' / '.join(plan)}")
+
+        user = User(enrollment_no='000000000777', username='plan_check', password='-')
+        db.session.add(user)
+        db.session.commit()
+        duplicates = {
+            'repeated Round 2 attempt': [
+                QuizResult(user_id=user.id, round_number=2, language=None, score=1, total_questions=20),
+                QuizResult(user_id=user.id, round_number=2, language='python', score=1, total_questions=20)
+            ],
+            'repeated Round 1 language': [
+                QuizResult(user_id=user.id, round_number=1, language='c', score=1, total_questions=20),
+                QuizResult(user_id=user.id, round_number=1, language='c', score=1, total_questions=20)
+            ],
+            'repeated challenge submission': [
+                Round3Submission(user_id=user.id, challenge_id=1, track_type='dsa', challenge_name='x', code='-'),
+                Round3Submission(user_id=user.id, challenge_id=1, track_type='dsa', challenge_name='x', code='-')
+            ]
+        }
+        for label, rows in duplicates.items():
+            rejected = rejects_duplicate(*rows)
+            failures += not rejected
+            print(f"{'ok' if rejected else 'ACCEPTED':>9}  {label}")
+
+        # Both Round 1 languages are separate attempts
+        other_language = QuizResult(user_id=user.id, round_number=1, language='python', score=1, total_questions=20)
+        allowed = not rejects_duplicate(other_language)
+        failures += not allowed
+        print(f"{'ok' if allowed else 'REJECTED':>9}  second Round 1 language")
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,104 @@
+"""
+Pre-compressed response bodies.
+
+Flask-Compress compresses dynamic responses on the way out, paying the CPU
+on every request. Bodies that only change with a version the app already
+tracks (leaderboard pages, question payloads) are compressed here once per
+version and encoding, and the bytes are reused until the version moves.
+
+``CompressedCache`` keeps whole compressed bodies in a small LRU.
+``deflate_piece`` / ``gzip_stitch`` serve bodies that are joined from
+fragments in a per-request order (shuffled question payloads): each
+fragment is deflated on its own once, and a request only concatenates the
+pieces between a gzip header and trailer.
+"""
+import collections
+import gzip
+import struct
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli not installed: bodies are only gzipped
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Fixed gzip header: deflate, no flags, no mtime, unknown OS
+_GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+# An empty final block closes the deflate stream after the last piece
+_DEFLATE_END = b'\x03\x00'
+
+
+def negotiate(accept_encodings, offered=ENCODINGS):
+    """The encoding in ``offered`` the client prefers (werkzeug ``Accept``), or ``None``."""
+    return accept_encodings.best_match(offered)
+
+
+def compress(body, encoding, gzip_level=9, brotli_quality=5):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+
+def deflate_piece(data, level=9):
+    # A fresh compressor has no history, and a sync flush ends the output on a byte
+    # boundary without a final block, so pieces can be concatenated in any order
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def gzip_stitch(pieces, body):
+    """One gzip member from deflated ``pieces``; ``body`` is their uncompressed concatenation."""
+    trailer = struct.pack('<II', zlib.crc32(body), len(body) & 0xffffffff)
+    return b''.join((_GZIP_HEADER, *pieces, _DEFLATE_END, trailer))
+
+
+class CompressedCache:
+    def __init__(self, max_entries=128, gzip_level=9, brotli_quality=5):
+        self._max_entries = max_entries
+        self._gzip_level = gzip_level
+        self._brotli_quality = brotli_quality
+        self._lock = threading.Lock()
+        # (key, encoding) -> compressed bytes, least recently used first
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def get(self, key, encoding):
+        if key is None or encoding is None:
+            return None
+        with self._lock:
+            body = self._entries.get((key, encoding))
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((key, encoding))
+            self.hits += 1
+            return body
+
+    def put(self, key, encoding, body):
+        """Compress ``body`` for ``encoding``, keep it under ``key`` and return the bytes."""
+        compressed = compress(body, encoding, self._gzip_level, self._brotli_quality)
+        with self._lock:
+            self._entries[(key, encoding)] = compressed
+            self._entries.move_to_end((key, encoding))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+        return compressed
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None
+            }
@@ -0,0 +1,79 @@
+"""
+Database engine settings.
+
+The database comes from DATABASE_URL and defaults to the bundled SQLite file.
+SQLite is tuned for several gunicorn workers writing to one file: WAL lets
+readers carry on while a writer commits, busy_timeout makes a writer wait
+for the lock instead of failing with "database is locked", and the pool is
+sized to the threads a worker actually runs. PostgreSQL (psycopg2) is what
+several app servers behind a load balancer should share; its connections are
+health-checked and recycled, and slow statements are cut off server side.
+Every value can be overridden from the environment.
+"""
+import os
+
+from sqlalchemy import event
+
+
+def database_uri():
+    uri = os.getenv('DATABASE_URL', 'sqlite:///quiz.db')
+    # Hosting providers still hand out the postgres:// scheme SQLAlchemy dropped
+    if uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def _is_sqlite_memory(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:')
+
+
+def sqlite_pragmas():
+    return {
+        'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '15000')),
+        # NORMAL is durable in WAL mode except for the last commits on power loss
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        # Negative values are KiB rather than pages
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000')),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        'temp_store': 'MEMORY'
+    }
+
+
+def engine_options(uri):
+    if _is_sqlite_memory(uri):
+        return {}
+
+    # One connection per request thread plus the background qualification job
+    threads = int(os.getenv('GUNICORN_THREADS', '2'))
+    options = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', str(threads + 1))),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '2')),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    }
+    if uri.startswith('sqlite'):
+        # The driver's own lock wait, kept in step with PRAGMA busy_timeout
+        options['connect_args'] = {'timeout': sqlite_pragmas()['busy_timeout'] / 1000}
+    elif uri.startswith('postgresql'):
+        # Drop connections the server or a proxy closed while they sat in the pool
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+        options['connect_args'] = {
+            'connect_timeout': int(os.getenv('PG_CONNECT_TIMEOUT', '10')),
+            'application_name': os.getenv('PG_APPLICATION_NAME', 'quiz-app'),
+            'options': f"-c statement_timeout={int(os.getenv('PG_STATEMENT_TIMEOUT_MS', '30000'))}"
+        }
+    return options
+
+
+def register_sqlite_pragmas(engine):
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
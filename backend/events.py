@@ -0,0 +1,333 @@
+"""
+Server-Sent Events fan-out for round access, qualification and scoring changes.
+
+Events are published to a broker shared by all gunicorn workers. Each worker
+runs one pump thread that reads new events from the broker and hands them to
+the streams connected to that worker. FileBroker is an append-only JSON-lines
+log in the instance folder, rotated and compacted by size, which is enough
+for the workers of a single machine; DatabaseBroker keeps the same log in a table so app servers on
+several machines see each other's events.
+"""
+import contextlib
+import json
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import func, insert, select, text
+
+try:
+    import fcntl
+except ImportError:  # Windows: development only, a single process publishes
+    fcntl = None
+
+
+class FileBroker:
+    """Event log in JSON-lines segment files next to ``path``.
+
+    Event ids are byte offsets into the whole log, so they only grow and a
+    reconnecting client can resume from its Last-Event-ID. Each segment is
+    named after the offset it starts at (``events.<offset>.log``). Once the
+    newest one reaches ``max_bytes`` a new segment is started, and segments
+    that have not been written to for ``retention`` seconds are removed,
+    keeping at least ``keep_segments``. Every worker's pump reads the log
+    twice a second, so by then every subscriber has moved past them; a
+    client reconnecting from further back replays from the oldest segment.
+    """
+
+    def __init__(self, path, max_bytes=1024 * 1024, keep_segments=2, retention=900):
+        self.directory = os.path.dirname(path)
+        self.stem, self.extension = os.path.splitext(os.path.basename(path))
+        self.max_bytes = max_bytes
+        self.keep_segments = keep_segments
+        self.retention = retention
+        self._lock_path = path + '.lock'
+        self._newest = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _segment_path(self, base):
+        return os.path.join(self.directory, f'{self.stem}.{base:016d}{self.extension}')
+
+    def _segments(self):
+        # Start offsets of the segments on disk, oldest first
+        prefix = self.stem + '.'
+        bases = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(self.extension):
+                middle = name[len(prefix):len(name) - len(self.extension)]
+                if middle.isdigit():
+                    bases.append(int(middle))
+        return sorted(bases)
+
+    def _size(self, base):
+        try:
+            return os.stat(self._segment_path(base)).st_size
+        except FileNotFoundError:
+            return 0
+
+    def start(self):
+        """The oldest offset still on disk; reading from before it skips events."""
+        segments = self._segments()
+        return segments[0] if segments else 0
+
+    def end(self):
+        # One stat() while the newest segment we know of is still being written to
+        if self._newest is not None:
+            try:
+                size = os.stat(self._segment_path(self._newest)).st_size
+                if size < self.max_bytes:
+                    return self._newest + size
+            except FileNotFoundError:
+                pass
+        segments = self._segments()
+        if not segments:
+            self._newest = None
+            return 0
+        self._newest = segments[-1]
+        return segments[-1] + self._size(segments[-1])
+
+    @contextlib.contextmanager
+    def _publish_lock(self):
+        # Rotation must not interleave with another worker's append
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def publish(self, event):
+        line = json.dumps(event, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self._publish_lock():
+            segments = self._segments() or [0]
+            base = segments[-1]
+            fd = os.open(self._segment_path(base), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size >= self.max_bytes:
+                # The full segment is never written again, so ids carry on from its end
+                open(self._segment_path(base + size), 'ab').close()
+                self._compact(segments + [base + size])
+
+    def _compact(self, segments):
+        cutoff = time.time() - self.retention
+        for base in segments[:-self.keep_segments]:
+            path = self._segment_path(base)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+
+    def read_since(self, offset):
+        """Return ``([(event_id, event), ...], new_offset)`` for complete lines after ``offset``.
+
+        An offset older than the oldest segment resumes from that segment; one
+        past the end of the log (which was removed or replaced) returns no
+        events and the current end.
+        """
+        segments = self._segments()
+        if not segments:
+            return [], 0
+        end = segments[-1] + self._size(segments[-1])
+        if offset > end:
+            return [], end
+        offset = max(offset, segments[0])
+        events = []
+        position = offset
+        for index, base in enumerate(segments):
+            following = segments[index + 1] if index + 1 < len(segments) else None
+            if following is not None and following <= position:
+                continue
+            try:
+                with open(self._segment_path(base), 'rb') as file:
+                    file.seek(position - base)
+                    chunk = file.read()
+            except FileNotFoundError:
+                # Compacted away by another worker, carry on with the next segment
+                if following is not None:
+                    position = following
+                continue
+            complete = True
+            for line in chunk.splitlines(keepends=True):
+                if not line.endswith(b'\n'):
+                    # Partially written line, pick it up on the next read
+                    complete = False
+                    break
+                position += len(line)
+                try:
+                    events.append((position, json.loads(line)))
+                except ValueError:
+                    continue
+            if not complete:
+                break
+        return events, position
+
+
+class DatabaseBroker:
+    """Event log in ``table`` (columns ``id`` and ``payload``); event ids are row ids."""
+
+    def __init__(self, engine, table, batch_size=500):
+        self._engine = engine
+        self._table = table
+        self._batch_size = batch_size
+
+    def start(self):
+        # Rows are never removed
+        return 0
+
+    def end(self):
+        with self._engine.connect() as connection:
+            return connection.execute(select(func.max(self._table.c.id))).scalar() or 0
+
+    def publish(self, event):
+        payload = json.dumps(event, separators=(',', ':'))
+        with self._engine.begin() as connection:
+            if connection.dialect.name == 'postgresql':
+                # Serialize publishers so ids become visible in order and no reader skips one
+                connection.execute(text(f'LOCK TABLE {self._table.name} IN SHARE ROW EXCLUSIVE MODE'))
+            connection.execute(insert(self._table).values(payload=payload))
+
+    def read_since(self, offset):
+        table = self._table
+        with self._engine.connect() as connection:
+            rows = connection.execute(
+                select(table.c.id, table.c.payload).where(table.c.id > offset)
+                .order_by(table.c.id).limit(self._batch_size)
+            ).all()
+        events = []
+        position = offset
+        for event_id, payload in rows:
+            position = event_id
+            try:
+                events.append((event_id, json.loads(payload)))
+            except ValueError:
+                continue
+        return events, position
+
+
+class Subscriber:
+    def __init__(self, user_id=None, max_pending=100):
+        self.user_id = user_id
+        self.closed = False
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def wants(self, event):
+        # Broadcast events go to everyone, targeted events only to their user
+        return event.get('user_id') is None or event.get('user_id') == self.user_id
+
+    def put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Slow client: drop it, EventSource reconnects and resumes by Last-Event-ID
+            self.closed = True
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    def __init__(self, broker, poll_interval=0.5, max_subscribers=None):
+        self._broker = broker
+        self._poll_interval = poll_interval
+        self._max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._offset = None
+        self.published = 0
+        self.delivered = 0
+        self.refused = 0
+        self.errors = 0
+
+    def publish(self, event_type, data, user_id=None):
+        if self._max_subscribers == 0:
+            # Streams are disabled, nobody could receive it
+            return
+        event = {'type': event_type, 'data': data, 'user_id': user_id, 'sent_at': time.time()}
+        self._broker.publish(event)
+        self.published += 1
+
+    def subscribe(self, user_id=None, last_event_id=None):
+        # None when this worker already holds max_subscribers streams
+        subscriber = Subscriber(user_id)
+        with self._lock:
+            if self._max_subscribers is not None and len(self._subscribers) >= self._max_subscribers:
+                self.refused += 1
+                return None
+            self._subscribers.add(subscriber)
+            # A pump that died is restarted and resumes from where it stopped
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    self._offset = self._broker.end()
+                self._thread = threading.Thread(target=self._pump, name='event-hub', daemon=True)
+                self._thread.start()
+            offset = self._offset
+        # Replay what the client missed while it was reconnecting. An id past the end of
+        # the log means the log was reset underneath the client: there is nothing to
+        # replay and the stream simply carries on with the current log's ids.
+        if last_event_id is not None and last_event_id < offset:
+            for event_id, event in self._broker.read_since(last_event_id)[0]:
+                if event_id <= offset and subscriber.wants(event):
+                    subscriber.put((event_id, event))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _pump(self):
+        failures = 0
+        while True:
+            # Back off while the broker keeps failing, up to 30 poll intervals
+            time.sleep(self._poll_interval * min(2 ** failures, 30))
+            try:
+                self._pump_once()
+                failures = 0
+            except Exception as e:
+                # A locked database, a lost connection or a segment rotated away mid-read:
+                # the offset has not moved, so the next poll picks up where this one stopped
+                failures += 1
+                self.errors += 1
+                print(f"Error reading live events: {str(e)}")
+
+    def _pump_once(self):
+        # Only read the broker when it has grown
+        end = self._broker.end()
+        if end == self._offset:
+            return
+        if end < self._offset:
+            # The log was removed or replaced, start over from its beginning
+            self._offset = 0
+        events, offset = self._broker.read_since(self._offset)
+        with self._lock:
+            self._offset = offset
+            subscribers = list(self._subscribers)
+        for event_id, event in events:
+            for subscriber in subscribers:
+                if not subscriber.closed and subscriber.wants(event):
+                    subscriber.put((event_id, event))
+                    self.delivered += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'max_subscribers': self._max_subscribers,
+                'refused': self.refused,
+                'published': self.published,
+                'delivered': self.delivered,
+                'errors': self.errors,
+                'offset': self._offset
+            }
@@ -0,0 +1,113 @@
+"""
+Ingest pipeline for question and option images uploaded by admins.
+
+An upload is decoded once and re-encoded without metadata: WebP when Pillow
+supports it, optimized PNG otherwise. Each width-limited variant is written
+under a name that includes the upload's content hash. The returned record
+lists the variants, so quiz payloads can offer a ``srcset`` and small screens
+download a fraction of the bytes.
+
+Pillow is optional. Without it an upload is stored as sent, still under its
+content hash, with no variants.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import os
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow not installed: images are stored as uploaded
+    Image = None
+
+UPLOAD_EXTENSIONS = {'image/png': 'png', 'image/jpeg': 'jpg', 'image/gif': 'gif', 'image/webp': 'webp'}
+
+
+def decode_data_url(data_url):
+    """Return ``(mimetype, bytes)`` of a ``data:image/...;base64,`` URL; raises ValueError."""
+    header, _, encoded = data_url.partition(',')
+    mimetype = header[len('data:'):].split(';', 1)[0].lower()
+    if mimetype not in UPLOAD_EXTENSIONS:
+        raise ValueError(f'Unsupported image type: {mimetype or "unknown"}')
+    try:
+        return mimetype, base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError('Image data is not valid base64')
+
+
+def atomic_write(path, data):
+    # Readers in other workers see the old file or the new one, never a partial write
+    temporary_path = f'{path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+
+def write_once(path, data):
+    # Names carry the content hash, so an existing file already holds these bytes
+    if not os.path.exists(path):
+        atomic_write(path, data)
+
+
+class ImagePipeline:
+    def __init__(self, widths=(480, 960), max_width=1920, image_format='webp', quality=85):
+        self.widths = sorted(widths)
+        self.max_width = max_width
+        self.quality = quality
+        if Image is None:
+            self.format = None
+        elif image_format == 'webp' and not features.check('webp'):
+            self.format = 'png'
+        else:
+            self.format = image_format
+
+    def ingest(self, data_url, directory, name, url_prefix):
+        """Store an uploaded image as ``<name>-<hash>...`` files in ``directory``.
+
+        Returns ``{'path', 'hash', 'variants', 'files', 'bytes_in', 'bytes_out'}``, where ``path`` is the
+        largest variant's URL path, ``variants`` lists ``{'path', 'width', 'height'}`` smallest first and
+        ``files`` the files written. Raises ValueError for anything that is not a readable image.
+        """
+        mimetype, original = decode_data_url(data_url)
+        digest = hashlib.sha256(original).hexdigest()[:16]
+        if self.format is None:
+            filename = f'{name}-{digest}.{UPLOAD_EXTENSIONS[mimetype]}'
+            write_once(os.path.join(directory, filename), original)
+            return {'path': f'{url_prefix}/{filename}', 'hash': digest, 'variants': [],
+                    'files': [os.path.join(directory, filename)],
+                    'bytes_in': len(original), 'bytes_out': len(original)}
+
+        try:
+            with Image.open(io.BytesIO(original)) as image:
+                image.load()
+                # Apply the camera rotation, then drop EXIF/ICC and anything else by re-encoding
+                image = ImageOps.exif_transpose(image)
+        except (OSError, Image.DecompressionBombError, SyntaxError):
+            raise ValueError(f'Not a readable image ({mimetype})')
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        # The listed widths below the image's own, plus the full image up to max_width
+        full_width = min(image.width, self.max_width)
+        widths = [width for width in self.widths if width < full_width] + [full_width]
+        variants = []
+        files = []
+        bytes_out = 0
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if (width, height) == image.size else image.resize((width, height), Image.LANCZOS)
+            encoded = io.BytesIO()
+            if self.format == 'webp':
+                resized.save(encoded, 'WEBP', quality=self.quality, method=4)
+            else:
+                resized.save(encoded, 'PNG', optimize=True)
+            filename = f'{name}-{digest}-{width}w.{self.format}'
+            path = os.path.join(directory, filename)
+            write_once(path, encoded.getvalue())
+            files.append(path)
+            bytes_out += encoded.tell()
+            variants.append({'path': f'{url_prefix}/{filename}', 'width': width, 'height': height})
+
+        return {'path': variants[-1]['path'], 'hash': digest, 'variants': variants, 'files': files,
+                'bytes_in': len(original), 'bytes_out': bytes_out}
@@ -0,0 +1,400 @@
+"""
+Materialized leaderboard kept up to date incrementally on every score write.
+
+Per-user, per-round totals are held in memory and each leaderboard view
+(all rounds, public rounds, or a single round) keeps its sort keys in a
+SortedKeys: a blocked sorted list, chunks of at most 2 * SortedKeys.LOAD
+keys with a binary indexed tree over the chunk lengths. A score write only
+repositions one user, in O(log n) (two binary searches, a memmove within
+one chunk and a tree update), and a read only touches the page it returns.
+
+Every write is also appended to a shared delta log (a FileBroker or
+DatabaseBroker from events.py) as the user's new per-round aggregate.
+Other workers replay the deltas they have not seen yet instead of
+rebuilding; only bulk changes (:meth:`invalidate`), a log that was
+compacted past them or a first access load everything from the database.
+Deltas set aggregates rather than add to them, so replaying one that a
+rebuild already read changes nothing.
+"""
+import bisect
+import threading
+import uuid
+from datetime import datetime
+
+# Round 3 scores are only visible to admins
+HIDDEN_ROUNDS = (3,)
+
+
+def view_key(round_filter=None, is_admin=False):
+    if round_filter:
+        return ('round', round_filter)
+    return ('all',) if is_admin else ('public',)
+
+
+def _view_includes(key, round_number):
+    if key[0] == 'round':
+        return round_number == key[1]
+    if key[0] == 'public':
+        return round_number not in HIDDEN_ROUNDS
+    return True
+
+
+class SortedKeys:
+    """A sorted list of unique keys with O(log n) add, remove and index.
+
+    Keys live in chunks of LOAD to 2 * LOAD keys, found by bisecting the
+    chunks' largest keys. A binary indexed tree over the chunk lengths turns
+    a position within a chunk into an overall index and back. Splitting a
+    chunk rebuilds the tree, O(n / LOAD), once every LOAD or so additions.
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys=()):
+        # keys must already be sorted
+        keys = list(keys)
+        self._chunks = [keys[start:start + self.LOAD] for start in range(0, len(keys), self.LOAD)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(keys)
+        self._build_tree()
+
+    def __len__(self):
+        return self._len
+
+    def _build_tree(self):
+        tree = [0] + [len(chunk) for chunk in self._chunks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _grow(self, position, delta):
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _before(self, position):
+        # Number of keys in the chunks before this one
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
+
+    def _locate(self, index):
+        # (chunk, offset within it) of the key at an overall index
+        position = 0
+        step = 1 << (len(self._tree).bit_length() - 1)
+        while step:
+            if position + step < len(self._tree) and self._tree[position + step] <= index:
+                position += step
+                index -= self._tree[position]
+            step >>= 1
+        return position, index
+
+    def add(self, key):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._build_tree()
+            return
+        position = bisect.bisect_left(self._maxes, key)
+        if position == len(self._maxes):
+            position -= 1
+            self._chunks[position].append(key)
+            self._maxes[position] = key
+        else:
+            bisect.insort(self._chunks[position], key)
+        self._len += 1
+        chunk = self._chunks[position]
+        if len(chunk) > 2 * self.LOAD:
+            self._chunks[position:position + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+            self._maxes[position:position + 1] = [chunk[self.LOAD - 1], chunk[-1]]
+            self._build_tree()
+        else:
+            self._grow(position, 1)
+
+    def remove(self, key):
+        position = bisect.bisect_left(self._maxes, key)
+        chunk = self._chunks[position]
+        del chunk[bisect.bisect_left(chunk, key)]
+        self._len -= 1
+        if chunk:
+            self._maxes[position] = chunk[-1]
+            self._grow(position, -1)
+        else:
+            del self._chunks[position]
+            del self._maxes[position]
+            self._build_tree()
+
+    def index(self, key):
+        """Position of a key that is in the list."""
+        position = bisect.bisect_left(self._maxes, key)
+        return self._before(position) + bisect.bisect_left(self._chunks[position], key)
+
+    def slice(self, start, stop):
+        """The keys at positions start to stop (exclusive)."""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        position, offset = self._locate(start)
+        keys = []
+        while len(keys) < stop - start:
+            keys.extend(self._chunks[position][offset:offset + stop - start - len(keys)])
+            position += 1
+            offset = 0
+        return keys
+
+
+class LeaderboardView:
+    def __init__(self):
+        # Sorted by (-total_score, latest_completion, user_id): best first,
+        # earlier submissions rank higher on equal scores
+        self.keys = SortedKeys()
+        self.by_user = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def upsert(self, user_id, totals):
+        self.remove(user_id)
+        if totals is None:
+            return
+        key = (-totals['total_score'], totals['latest_completion'], user_id)
+        self.keys.add(key)
+        self.by_user[user_id] = (key, totals)
+
+    def remove(self, user_id):
+        item = self.by_user.pop(user_id, None)
+        if item is not None:
+            self.keys.remove(item[0])
+
+    def rank_of(self, user_id):
+        item = self.by_user.get(user_id)
+        if item is None:
+            return None
+        return self.keys.index(item[0]) + 1
+
+    def slice(self, offset=0, limit=None):
+        end = len(self.keys) if limit is None else offset + limit
+        # (rank, user_id, totals) for each user on the page
+        return [(offset + i + 1, key[2], self.by_user[key[2]][1]) for i, key in enumerate(self.keys.slice(offset, end))]
+
+
+class MaterializedLeaderboard:
+    def __init__(self, loader, log):
+        # loader() -> (users, rounds): users maps user_id to the displayed user
+        # fields, rounds maps (user_id, round_number) to that round's aggregate.
+        # log is the delta log shared with the other workers; its end offset is
+        # the leaderboard version.
+        self._loader = loader
+        self._log = log
+        self._origin = uuid.uuid4().hex
+        self._lock = threading.RLock()
+        self._seen = None
+        self._users = {}
+        self._rounds = {}
+        self._views = {}
+        self.rebuilds = 0
+        self.deltas_applied = 0
+
+    def _sync(self):
+        # Returns True when the in-memory state was rebuilt from the database
+        current = self._log.end()
+        if current == self._seen:
+            return False
+        if self._seen is not None and self._log.start() <= self._seen < current and self._catch_up(current):
+            return False
+        users, rounds = self._loader()
+        self._users = users
+        self._rounds = {}
+        for (user_id, round_number), aggregate in rounds.items():
+            self._rounds.setdefault(user_id, {})[round_number] = aggregate
+        self._views = {}
+        self._seen = current
+        self.rebuilds += 1
+        return True
+
+    def _catch_up(self, current):
+        # Replay other workers' deltas up to current; False if only a rebuild will do
+        while self._seen < current:
+            events, position = self._log.read_since(self._seen)
+            if position <= self._seen:
+                return False
+            for _, delta in events:
+                if delta['type'] == 'invalidate':
+                    return False
+                if delta['origin'] != self._origin:
+                    self._apply_delta(delta)
+            self._seen = position
+        return True
+
+    def _apply_delta(self, delta):
+        user = delta['user']
+        if delta['type'] == 'user':
+            if user['user_id'] in self._users:
+                self._users[user['user_id']] = {k: v for k, v in user.items() if k != 'user_id'}
+            return
+        aggregate = dict(delta['aggregate'])
+        if aggregate['latest_completion'] is not None:
+            aggregate['latest_completion'] = datetime.fromisoformat(aggregate['latest_completion'])
+        self._store(user, delta['round_number'], aggregate)
+        self.deltas_applied += 1
+
+    def _publish(self, delta):
+        # Our own state already has the change; the other workers replay it
+        self._log.publish(dict(delta, origin=self._origin))
+
+    def _publish_aggregate(self, user, round_number):
+        aggregate = dict(self._rounds[user['user_id']][round_number])
+        if aggregate['latest_completion'] is not None:
+            aggregate['latest_completion'] = aggregate['latest_completion'].isoformat()
+        self._publish({'type': 'aggregate', 'user': user, 'round_number': round_number, 'aggregate': aggregate})
+
+    def invalidate(self):
+        # For bulk changes (e.g. qualification updates): every worker rebuilds
+        with self._lock:
+            self._publish({'type': 'invalidate'})
+            self._seen = None
+
+    def _totals(self, user_id, key):
+        rounds = [
+            aggregate for round_number, aggregate in self._rounds.get(user_id, {}).items()
+            if _view_includes(key, round_number)
+        ]
+        # Only users with at least one score in the view are ranked
+        scored = [aggregate for aggregate in rounds if aggregate['scores']]
+        if not scored:
+            return None
+        return {
+            'total_score': sum(aggregate['total_score'] for aggregate in scored),
+            'raw_score': sum(aggregate['raw_score'] for aggregate in scored),
+            'penalty_points': sum(aggregate['penalty_points'] for aggregate in scored),
+            'latest_completion': max(aggregate['latest_completion'] for aggregate in scored),
+            'total_questions': sum(aggregate['total_questions'] for aggregate in rounds)
+        }
+
+    def _view(self, key):
+        view = self._views.get(key)
+        if view is None:
+            view = LeaderboardView()
+            entries = []
+            for user_id in self._rounds:
+                if user_id not in self._users:
+                    continue
+                totals = self._totals(user_id, key)
+                if totals is not None:
+                    entries.append(((-totals['total_score'], totals['latest_completion'], user_id), totals))
+            # One sort on first use, then kept ordered incrementally
+            entries.sort(key=lambda entry: entry[0])
+            view.keys = SortedKeys(entry[0] for entry in entries)
+            view.by_user = {entry[0][2]: entry for entry in entries}
+            self._views[key] = view
+        return view
+
+    def _entry(self, rank, user_id, totals):
+        total_questions = totals['total_questions']
+        return dict(
+            self._users[user_id],
+            user_id=user_id,
+            total_score=totals['total_score'],
+            raw_score=totals['raw_score'],
+            penalty_points=totals['penalty_points'],
+            total_questions=total_questions,
+            percentage=round((totals['total_score'] / total_questions * 100), 2) if total_questions > 0 else 0,
+            latest_completion=totals['latest_completion'].isoformat(),
+            rank=rank
+        )
+
+    def version(self):
+        """The shared version the views are at, or ``None`` while it is unknown."""
+        with self._lock:
+            self._sync()
+            return self._seen
+
+    def page(self, key, offset=0, limit=None):
+        """Return ``(entries, total)`` for one page of a view; O(limit) once the view exists."""
+        with self._lock:
+            self._sync()
+            view = self._view(key)
+            entries = [self._entry(rank, user_id, totals) for rank, user_id, totals in view.slice(offset, limit)]
+            return entries, len(view)
+
+    def size(self, key):
+        with self._lock:
+            self._sync()
+            return len(self._view(key))
+
+    def entry_for(self, key, user_id):
+        """Return the leaderboard entry (with rank) for one user, or ``None``; O(log n) once the view exists."""
+        with self._lock:
+            self._sync()
+            view = self._view(key)
+            rank = view.rank_of(user_id)
+            if rank is None:
+                return None
+            return self._entry(rank, user_id, view.by_user[user_id][1])
+
+    def _store(self, user, round_number, aggregate):
+        user_id = user['user_id']
+        self._users[user_id] = {k: v for k, v in user.items() if k != 'user_id'}
+        self._rounds.setdefault(user_id, {})[round_number] = aggregate
+        for key, view in self._views.items():
+            if _view_includes(key, round_number):
+                view.upsert(user_id, self._totals(user_id, key))
+
+    def _apply(self, user, round_number, update):
+        aggregate = dict(self._rounds.get(user['user_id'], {}).get(round_number) or {
+            'scores': 0, 'total_score': 0, 'raw_score': 0, 'penalty_points': 0,
+            'latest_completion': None, 'total_questions': 0
+        })
+        update(aggregate)
+        self._store(user, round_number, aggregate)
+
+    def record_result(self, user, round_number, raw_score, penalty_points, total_score,
+                      total_questions, completion_time):
+        """Fold a newly committed QuizResult/UserScore pair into every view; O(log n) per view."""
+        def update(aggregate):
+            aggregate['scores'] += 1
+            aggregate['total_score'] += total_score
+            aggregate['raw_score'] += raw_score
+            aggregate['penalty_points'] += penalty_points
+            aggregate['total_questions'] += total_questions
+            if aggregate['latest_completion'] is None or completion_time > aggregate['latest_completion']:
+                aggregate['latest_completion'] = completion_time
+
+        with self._lock:
+            # A rebuild already read our committed write from the database
+            if not self._sync():
+                self._apply(user, round_number, update)
+            self._publish_aggregate(user, round_number)
+
+    def record_questions(self, user, round_number, added_questions):
+        """Account for QuizResult question counts changed without a UserScore (Round 3 scoring)."""
+        def update(aggregate):
+            aggregate['total_questions'] += added_questions
+
+        with self._lock:
+            if not self._sync():
+                self._apply(user, round_number, update)
+            if round_number in self._rounds.get(user['user_id'], {}):
+                self._publish_aggregate(user, round_number)
+
+    def update_user(self, user):
+        """Refresh the displayed fields (round, qualification, ...) of one user."""
+        with self._lock:
+            if not self._sync() and user['user_id'] in self._users:
+                self._users[user['user_id']] = {k: v for k, v in user.items() if k != 'user_id'}
+            self._publish({'type': 'user', 'user': user})
+
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self._seen,
+                'rebuilds': self.rebuilds,
+                'deltas_applied': self.deltas_applied,
+                'views': {'/'.join(str(part) for part in key): len(view) for key, view in self._views.items()}
+            }
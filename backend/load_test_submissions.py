@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Load test: concurrent quiz submissions against the SQLite database
+
+Forks several worker processes (like gunicorn does) with many threads each,
+and has every simulated participant submit their Round 1 results for both
+languages at the same moment through POST /api/quiz/result. Reports the
+"database is locked" error rate and commit latency percentiles.
+
+By default it runs twice, once with SQLite's default journaling and once
+with the tuned settings from database.py, and prints both.
+
+Each configuration gets a fresh SQLite file in a temporary directory, so it
+never touches the contest database.
+
+Usage:
+python load_test_submissions.py [submitters] [processes]      (default: 300 9)
+"""
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# What the app ran with before database.py: rollback journal, FULL sync and
+# Python's default 5 second lock wait
+BASELINE_ENV = {
+    'SQLITE_JOURNAL_MODE': 'DELETE',
+    'SQLITE_BUSY_TIMEOUT_MS': '5000',
+    'SQLITE_SYNCHRONOUS': 'FULL',
+    'SQLITE_CACHE_SIZE_KB': '2000',
+    'SQLITE_MMAP_SIZE': '0',
+    'DB_POOL_SIZE': '5',
+    'DB_MAX_OVERFLOW': '10'
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_process(user_ids, start_at, results):
+    # Runs in a forked child: fresh connections, quiet request logging
+    from app import app, db
+    sys.stdout = open(os.devnull, 'w')
+    with app.app_context():
+        db.engine.dispose()
+
+    samples = []
+    lock = threading.Lock()
+
+    def submit(user_id):
+        client = app.test_client()
+        while time.time() < start_at:
+            time.sleep(0.001)
+        for language in ('python', 'c'):
+            began = time.perf_counter()
+            response = client.post('/api/quiz/result', json={
+                'user_id': user_id, 'round_number': 1, 'language': language,
+                'score': user_id % 20, 'total_questions': 20
+            })
+            elapsed = time.perf_counter() - began
+            body = response.get_data(as_text=True)
+            with lock:
+                samples.append((response.status_code, 'locked' in body, elapsed))
+
+    threads = [threading.Thread(target=submit, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(samples)
+
+
+def run_once(submitters, processes):
+    from app import app, db, User
+    from werkzeug.security import generate_password_hash
+
+    with app.app_context():
+        # One hash for everyone, the test is about commits not logins
+        password = generate_password_hash('loadtest')
+        users = [
+            User(enrollment_no=f'L{i:011d}', username=f'load_{i}', password=password, is_admin=False)
+            for i in range(submitters)
+        ]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        db.engine.dispose()
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    start_at = time.time() + 2
+    children = [
+        context.Process(target=run_process, args=(user_ids[i::processes], start_at, results))
+        for i in range(processes)
+    ]
+    for child in children:
+        child.start()
+    samples = []
+    for _ in children:
+        samples.extend(results.get())
+    for child in children:
+        child.join()
+
+    latencies = [elapsed * 1000 for status, _, elapsed in samples if status == 201]
+    return {
+        'requests': len(samples),
+        'committed': len(latencies),
+        'lock_errors': sum(1 for _, locked, _ in samples if locked),
+        'other_errors': sum(1 for status, locked, _ in samples if status != 201 and not locked),
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99)
+    }
+
+
+if __name__ == '__main__':
+    submitters = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else 9
+
+    if os.getenv('LOAD_TEST_CHILD'):
+        stats = run_once(submitters, processes)
+        sys.stdout = sys.__stdout__
+        print('LOAD_TEST_RESULT ' + json.dumps(stats))
+        sys.exit(0)
+
+    print(f"{submitters} submitters across {processes} processes, 2 submissions each")
+    print(f"{'configuration':>14} {'committed':>10} {'lock errors':>12} {'error rate':>11} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for label, overrides in (('default', BASELINE_ENV), ('tuned', {})):
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = 'sqlite:///' + os.path.join(directory, 'load_test.db')
+            env = dict(os.environ, LOAD_TEST_CHILD='1', DATABASE_URL=database_url, **overrides)
+            output = subprocess.run(
+                [sys.executable, __file__, str(submitters), str(processes)],
+                env=env, capture_output=True, text=True
+            ).stdout
+        line = next((l for l in output.splitlines() if l.startswith('LOAD_TEST_RESULT ')), None)
+        if line is None:
+            print(f"{label:>14} failed:\n{output[-2000:]}")
+            continue
+        stats = json.loads(line[len('LOAD_TEST_RESULT '):])
+        error_rate = stats['lock_errors'] / stats['requests'] * 100 if stats['requests'] else 0
+        print(f"{label:>14} {stats['committed']:>10} {stats['lock_errors']:>12} {error_rate:>10.1f}% "
+              f"{stats['p50_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
@@ -0,0 +1,225 @@
+"""
+Versioned, non-destructive schema migrations.
+
+Each migration runs once per database and is recorded in the
+schema_migrations table. Steps only create or alter what is missing, so a
+step that was interrupted half way can simply run again. Migrations are
+applied under a lock (a PostgreSQL advisory lock, or a lock file in the
+instance folder for SQLite) so only one process does the work; every other
+process just sees that the schema is current.
+"""
+import contextlib
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, literal, select, text
+
+try:
+    import fcntl
+except ImportError:  # Windows: development only, a single process migrates
+    fcntl = None
+
+# Arbitrary key shared by every app server for pg_advisory_lock
+ADVISORY_LOCK_KEY = 72016
+
+_migration_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _migration_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return fn
+    return register
+
+
+def head():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def current_version(connection):
+    if not inspect(connection).has_table('schema_migrations'):
+        return 0
+    versions = connection.execute(select(schema_migrations.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def is_current(engine):
+    with engine.connect() as connection:
+        return current_version(connection) >= head()
+
+
+@contextlib.contextmanager
+def process_lock(engine, lock_path, key):
+    """Hold an exclusive lock shared by every process: PostgreSQL advisory lock ``key``, else the file ``lock_path``."""
+    if engine.dialect.name == 'postgresql':
+        # Held on its own connection so it spans every transaction below, on every node
+        with engine.connect() as connection:
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': key})
+            connection.commit()
+            try:
+                yield
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': key})
+                connection.commit()
+        return
+
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def migration_lock(engine, lock_path):
+    return process_lock(engine, lock_path, ADVISORY_LOCK_KEY)
+
+
+def upgrade(engine, metadata):
+    """Apply pending migrations; returns the names of those applied. Call under migration_lock."""
+    applied = []
+    with engine.begin() as connection:
+        _migration_metadata.create_all(connection)
+        done = set(connection.execute(select(schema_migrations.c.version)).scalars())
+    for version, name, fn in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as connection:
+            fn(connection, metadata)
+            connection.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow()
+            ))
+        applied.append(name)
+        print(f"Applied migration {version}: {name}")
+    return applied
+
+
+def add_column_if_missing(connection, table, column):
+    if column.name in {c['name'] for c in inspect(connection).get_columns(table.name)}:
+        return
+    preparer = connection.dialect.identifier_preparer
+    ddl = (f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.quote(column.name)} '
+           f'{column.type.compile(dialect=connection.dialect)}')
+    if column.default is not None and column.default.is_scalar:
+        default = literal(column.default.arg, column.type)
+        ddl += ' DEFAULT ' + str(default.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    connection.execute(text(ddl))
+
+
+def index_exists(connection, table, index_name):
+    # Asked of the catalog directly: reflection skips expression indexes on SQLite
+    if connection.dialect.name == 'sqlite':
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"
+    elif connection.dialect.name == 'postgresql':
+        query = 'SELECT 1 FROM pg_indexes WHERE indexname = :name'
+    else:
+        return inspect(connection).has_index(table.name, index_name)
+    return connection.execute(text(query), {'name': index_name}).first() is not None
+
+
+def create_index_if_missing(connection, table, index_name):
+    if index_exists(connection, table, index_name):
+        return
+    index = next(index for index in table.indexes if index.name == index_name)
+    index.create(connection)
+
+
+@migration(1, 'create tables')
+def _create_tables(connection, metadata):
+    # Only tables that do not exist yet; existing data is never touched
+    metadata.create_all(connection)
+
+
+@migration(2, 'user score and qualification columns')
+def _user_score_columns(connection, metadata):
+    # Databases created before these columns were added to User
+    user = metadata.tables['user']
+    for name in ('total_score', 'round2_completed_at', 'qualified_for_round3'):
+        add_column_if_missing(connection, user, user.c[name])
+
+
+def remove_duplicates(connection, table, key, preference):
+    """Delete the rows sharing ``key(row)`` with a preferred row, lowest ``preference(row)`` kept.
+
+    Run before adding a unique index to a table that may predate it. Every
+    deleted row is printed with the row kept in its place.
+    """
+    kept = {}
+    rows = connection.execute(select(table).order_by(table.c.id)).mappings().all()
+    for row in rows:
+        current = kept.get(key(row))
+        if current is None or preference(row) < preference(current):
+            kept[key(row)] = row
+    duplicates = [(row, kept[key(row)]) for row in rows if kept[key(row)]['id'] != row['id']]
+    if not duplicates:
+        return 0
+    print(f"Removing {len(duplicates)} duplicate {table.name} rows before adding its unique index:")
+    for row, keeper in duplicates:
+        print(f"  id {row['id']} (user {row['user_id']}, key {key(row)[1:]}), keeping id {keeper['id']}")
+    connection.execute(table.delete().where(table.c.id.in_([row['id'] for row, _ in duplicates])))
+    return len(duplicates)
+
+
+@migration(3, 'lookup indexes and unique attempt keys')
+def _lookup_indexes(connection, metadata):
+    # Databases from before the unique keys may hold repeated attempts, which would
+    # make creating the indexes fail. The app has always read a user's first attempt
+    # (lowest id); for challenge submissions the highest scored one is kept.
+    quiz_result = metadata.tables['quiz_result']
+    if not index_exists(connection, quiz_result, 'uq_quiz_result_attempt'):
+        remove_duplicates(
+            connection, quiz_result,
+            lambda row: (row['user_id'], row['round_number'], (row['language'] or '') if row['round_number'] == 1 else ''),
+            lambda row: row['id']
+        )
+    round3_submission = metadata.tables['round3_submission']
+    if not index_exists(connection, round3_submission, 'uq_round3_submission_challenge'):
+        remove_duplicates(
+            connection, round3_submission,
+            lambda row: (row['user_id'], row['challenge_id'], row['track_type']),
+            lambda row: (-(row['score'] or 0) if row['scored'] else 1, row['id'])
+        )
+
+    indexes = {
+        'quiz_result': ('uq_quiz_result_attempt', 'ix_quiz_result_round_user'),
+        'user_score': ('ix_user_score_user_round', 'ix_user_score_round_user'),
+        'round3_submission': ('uq_round3_submission_challenge',)
+    }
+    for table_name, index_names in indexes.items():
+        for index_name in index_names:
+            create_index_if_missing(connection, metadata.tables[table_name], index_name)
+
+
+QUESTION_TABLE_MIGRATION = 'question bank table'
+
+
+@migration(4, QUESTION_TABLE_MIGRATION)
+def _question_table(connection, metadata):
+    # The app imports the bank files into it once this has been applied
+    metadata.tables['question'].create(connection, checkfirst=True)
+
+
+@migration(5, 'shared state payload column')
+def _cache_version_payload(connection, metadata):
+    # Lets workers share small state such as the last qualification run
+    cache_version = metadata.tables['cache_version']
+    add_column_if_missing(connection, cache_version, cache_version.c.payload)
+
+
+@migration(6, 'leaderboard delta log')
+def _leaderboard_log(connection, metadata):
+    # Workers replay each other's leaderboard writes from it instead of rebuilding
+    metadata.tables['leaderboard_log'].create(connection, checkfirst=True)
@@ -0,0 +1,69 @@
+"""
+Streaming multipart uploads.
+
+Reading ``request.files`` makes werkzeug parse the whole multipart body and
+spool every file to memory or a temporary file before the view sees it.
+``file_part`` instead decodes the request stream itself and returns the
+chosen file field as a readable stream, so an import can start on the
+first row while the rest of the upload is still arriving. Fields before
+the file are skipped, and nothing after it is read.
+"""
+import io
+
+from werkzeug.sansio.multipart import Data, Epilogue, File, MultipartDecoder, NeedData
+
+
+class MultipartFile(io.RawIOBase):
+    """The content of one file field of a multipart/form-data body, decoded as it is read."""
+
+    def __init__(self, stream, boundary, chunk_size=65536):
+        self._stream = stream
+        self._decoder = MultipartDecoder(boundary.encode('latin-1'))
+        self._chunk_size = chunk_size
+        self._pending = b''
+        self._done = False
+        self.filename = None
+
+    def _next_event(self):
+        while True:
+            event = self._decoder.next_event()
+            if not isinstance(event, NeedData):
+                return event
+            # An empty read ends the body; the decoder raises ValueError if it was cut short
+            self._decoder.receive_data(self._stream.read(self._chunk_size) or None)
+
+    def find(self, field):
+        """Skip to the file field named ``field``; False if the body has none."""
+        while True:
+            event = self._next_event()
+            if isinstance(event, File) and event.name == field:
+                self.filename = event.filename
+                return True
+            if isinstance(event, Epilogue):
+                return False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending and not self._done:
+            event = self._next_event()
+            if not isinstance(event, Data):
+                raise ValueError('Malformed multipart body')
+            self._pending = event.data
+            self._done = not event.more_data
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def file_part(stream, boundary, field='file', chunk_size=65536):
+    """Return ``(filename, stream)`` for the file field ``field``, or None if it is missing.
+
+    Raises ValueError for a malformed body.
+    """
+    part = MultipartFile(stream, boundary, chunk_size)
+    if not part.find(field):
+        return None
+    return part.filename, io.BufferedReader(part, chunk_size)
@@ -0,0 +1,269 @@
+"""
+Bulk participant provisioning.
+
+``provision`` loads a roster in one pass, skips enrollment numbers and
+usernames that already exist (one query each), hashes the new passwords
+across a process pool and inserts the accounts in chunks. It runs out of
+band through ``flask --app app provision`` (or ``migrate``), never inside a
+worker boot.
+
+``RosterImporter`` does the same for an uploaded CSV or NDJSON file, one
+row at a time: rows are validated and deduplicated as they are read and
+written in batches, and a result is produced for every row.
+"""
+import csv
+import functools
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+REQUIRED_FIELDS = ('enrollment_no', 'username', 'password')
+# Column lengths on User, checked up front so one bad row cannot fail a whole batch
+FIELD_LIMITS = {'enrollment_no': 12, 'username': 80}
+ROSTER_FORMATS = ('csv', 'ndjson')
+
+
+def load_roster(path):
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def _hasher(method=None):
+    # A partial of a module level function, so it can be sent to pool processes
+    return functools.partial(generate_password_hash, method=method) if method else generate_password_hash
+
+
+def hash_passwords(passwords, processes=None, method=None, pool=None):
+    hasher = _hasher(method)
+    processes = processes or os.cpu_count() or 1
+    if (processes == 1 and pool is None) or len(passwords) < 2:
+        return [hasher(password) for password in passwords]
+    # Hashing is pure CPU, so it scales with processes rather than threads
+    chunksize = max(1, len(passwords) // (processes * 4))
+    if pool is not None:
+        return list(pool.map(hasher, passwords, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=min(processes, len(passwords))) as pool:
+        return list(pool.map(hasher, passwords, chunksize=chunksize))
+
+
+def _account_row(enrollment_no, username, password_hash, registered_at):
+    return {
+        'enrollment_no': enrollment_no,
+        'username': username,
+        'password': password_hash,
+        'is_admin': False,
+        'current_round': 1,
+        'total_score': 0,
+        'qualified_for_round3': False,
+        'registered_at': registered_at
+    }
+
+
+def provision(session, user_model, participants, processes=None, chunk_size=500, hash_method=None):
+    """Create the accounts in ``participants`` that do not exist yet.
+
+    Returns counts (``created``, ``existing``, ``duplicates``, ``invalid``)
+    and timings (``seconds``, ``hash_seconds``, ``rows_per_second``).
+    """
+    began = time.perf_counter()
+    existing_enrollment_numbers = set(session.scalars(select(user_model.enrollment_no)))
+    existing_usernames = set(session.scalars(select(user_model.username)))
+
+    accounts = []
+    existing = duplicates = invalid = 0
+    seen_enrollment_numbers = set()
+    for row_number, participant in enumerate(participants, start=1):
+        # The same rules as RosterImporter: a value too long for its column would fail the whole chunk
+        values, error = validate_participant(participant)
+        if error:
+            print(f"Warning: Skipping invalid participant {row_number}: {error}")
+            invalid += 1
+            continue
+        enrollment_no, username, password = values
+        if enrollment_no in existing_enrollment_numbers:
+            existing += 1
+            continue
+        if enrollment_no in seen_enrollment_numbers or username in existing_usernames:
+            print(f"Warning: Skipping duplicate enrollment number or username: {enrollment_no} ({username})")
+            duplicates += 1
+            continue
+        seen_enrollment_numbers.add(enrollment_no)
+        existing_usernames.add(username)
+        accounts.append((enrollment_no, username, password))
+
+    hash_began = time.perf_counter()
+    hashes = hash_passwords([password for _, _, password in accounts], processes, hash_method)
+    hash_seconds = time.perf_counter() - hash_began
+
+    registered_at = datetime.utcnow()
+    rows = [
+        _account_row(enrollment_no, username, password_hash, registered_at)
+        for (enrollment_no, username, _), password_hash in zip(accounts, hashes)
+    ]
+    for start in range(0, len(rows), chunk_size):
+        session.execute(insert(user_model), rows[start:start + chunk_size])
+        session.commit()
+
+    seconds = time.perf_counter() - began
+    return {
+        'created': len(rows),
+        'existing': existing,
+        'duplicates': duplicates,
+        'invalid': invalid,
+        'seconds': round(seconds, 3),
+        'hash_seconds': round(hash_seconds, 3),
+        'rows_per_second': round(len(rows) / seconds, 1) if seconds else 0.0
+    }
+
+
+def roster_format(filename, mimetype):
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv' or mimetype in ('text/csv', 'application/csv'):
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl') or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
+
+
+def iter_roster(stream, roster_format):
+    """Yield ``(row_number, participant, error)`` from a binary stream, one row at a time."""
+    if roster_format == 'csv':
+        if not hasattr(stream, 'read1'):
+            stream = io.BufferedReader(stream)
+        # Row 1 is the header: enrollment_no,username,password
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        for row_number, row in enumerate(reader, start=2):
+            yield row_number, row, None
+        return
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line), None
+        except ValueError:
+            yield row_number, None, 'Invalid JSON'
+
+
+def validate_participant(participant):
+    """Return ``((enrollment_no, username, password), None)`` or ``(None, error)``."""
+    if not isinstance(participant, dict):
+        return None, 'Row is not an object'
+    values = {}
+    for field in REQUIRED_FIELDS:
+        value = participant.get(field)
+        value = str(value).strip() if value is not None else ''
+        if not value:
+            return None, f'Missing required field: {field}'
+        if len(value) > FIELD_LIMITS.get(field, len(value)):
+            return None, f'{field} is longer than {FIELD_LIMITS[field]} characters'
+        values[field] = value
+    return (values['enrollment_no'], values['username'], values['password']), None
+
+
+class RosterImporter:
+    def __init__(self, session, user_model, batch_size=500, processes=1, hash_method=None):
+        self._session = session
+        self._user = user_model
+        self._batch_size = batch_size
+        self._processes = processes
+        self._hash_method = hash_method
+        self._seen_enrollment_numbers = set()
+        self._seen_usernames = set()
+        # One counter per row status, plus totals
+        self.summary = {'rows': 0, 'created': 0, 'existing': 0, 'duplicate': 0, 'invalid': 0,
+                        'seconds': 0.0, 'rows_per_second': 0.0}
+
+    def run(self, rows):
+        """Consume ``(row_number, participant, error)`` tuples and yield one result per row."""
+        began = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=self._processes) if self._processes > 1 else None
+        try:
+            batch = []
+            for row_number, participant, error in rows:
+                self.summary['rows'] += 1
+                account = None
+                if error is None:
+                    account, error = validate_participant(participant)
+                if error is not None:
+                    yield self._result(row_number, 'invalid', error=error)
+                    continue
+                enrollment_no, username, _ = account
+                # Duplicates within the file are caught here, existing accounts per batch
+                if enrollment_no in self._seen_enrollment_numbers or username in self._seen_usernames:
+                    yield self._result(row_number, 'duplicate', enrollment_no, username,
+                                       'Duplicate enrollment number or username in file')
+                    continue
+                self._seen_enrollment_numbers.add(enrollment_no)
+                self._seen_usernames.add(username)
+                batch.append((row_number, account))
+                if len(batch) >= self._batch_size:
+                    yield from self._flush(batch, pool)
+                    batch = []
+            yield from self._flush(batch, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            seconds = time.perf_counter() - began
+            self.summary['seconds'] = round(seconds, 3)
+            self.summary['rows_per_second'] = round(self.summary['rows'] / seconds, 1) if seconds else 0.0
+
+    def _result(self, row_number, status, enrollment_no=None, username=None, error=None):
+        self.summary[status] += 1
+        result = {'row': row_number, 'status': status, 'enrollment_no': enrollment_no, 'username': username}
+        if error:
+            result['error'] = error
+        return result
+
+    def _flush(self, batch, pool):
+        if not batch:
+            return
+        user = self._user
+        enrollment_numbers = [account[0] for _, account in batch]
+        usernames = [account[1] for _, account in batch]
+        taken_enrollment_numbers = set(self._session.scalars(
+            select(user.enrollment_no).where(user.enrollment_no.in_(enrollment_numbers))
+        ))
+        taken_usernames = set(self._session.scalars(
+            select(user.username).where(user.username.in_(usernames))
+        ))
+
+        new_accounts = []
+        for row_number, (enrollment_no, username, password) in batch:
+            if enrollment_no in taken_enrollment_numbers or username in taken_usernames:
+                yield self._result(row_number, 'existing', enrollment_no, username,
+                                   'Enrollment number or username already exists')
+            else:
+                new_accounts.append((row_number, enrollment_no, username, password))
+
+        hashes = hash_passwords([password for *_, password in new_accounts], self._processes,
+                                self._hash_method, pool)
+        registered_at = datetime.utcnow()
+        rows = [
+            _account_row(enrollment_no, username, password_hash, registered_at)
+            for (_, enrollment_no, username, _), password_hash in zip(new_accounts, hashes)
+        ]
+        try:
+            if rows:
+                self._session.execute(insert(user), rows)
+            self._session.commit()
+            for row_number, enrollment_no, username, _ in new_accounts:
+                yield self._result(row_number, 'created', enrollment_no, username)
+        except IntegrityError:
+            # Someone else created one of these accounts meanwhile; insert the batch row by row
+            self._session.rollback()
+            for (row_number, enrollment_no, username, _), row in zip(new_accounts, rows):
+                try:
+                    self._session.execute(insert(user), [row])
+                    self._session.commit()
+                    yield self._result(row_number, 'created', enrollment_no, username)
+                except IntegrityError:
+                    self._session.rollback()
+                    yield self._result(row_number, 'existing', enrollment_no, username,
+                                       'Enrollment number or username already exists')
@@ -0,0 +1,207 @@
+"""
+In-process cache for the question banks.
+
+Each bank is loaded once per worker process and served from memory until it
+changes. Banks held in the QuestionStore are reloaded when their shared
+version moves. Anything else is a JSON file, reloaded when its mtime/size
+changes on disk or an admin write invalidates it.
+Participant-facing endpoints can also ask for a prepared payload: the bank
+run through a per-question transform and pre-encoded to JSON bytes once per
+bank version, so a fetch only has to join fragments in the order it wants.
+The same goes for gzip: fragments are deflated once per bank version and a
+fetch stitches the compressed pieces together.
+"""
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+
+from compression import deflate_piece, gzip_stitch
+
+
+@functools.lru_cache(maxsize=4096)
+def _seeded_order(user_id, round_key, version, indices):
+    # Fisher-Yates over the payload's index array, seeded so the same user sees
+    # the same order for a given round and bank version
+    digest = hashlib.sha256(f'{user_id}:{round_key}:{version}'.encode('utf-8')).digest()
+    order = list(indices)
+    random.Random(int.from_bytes(digest[:8], 'big')).shuffle(order)
+    return tuple(order)
+
+
+class PreparedPayload:
+    def __init__(self, questions, fragments):
+        self.questions = questions
+        self.fragments = fragments
+        self.indices = range(len(fragments))
+        # Deflated fragments for render_gzip, built on first use
+        self._gzip_pieces = None
+        # Strong ETag for the canonical (unshuffled) payload of this bank version
+        self.etag = hashlib.sha256(self.render()).hexdigest()[:32]
+
+    def __len__(self):
+        return len(self.fragments)
+
+    def seeded_order(self, user_id, round_key):
+        """Deterministic permutation for ``user_id`` on this bank version (memoized)."""
+        return _seeded_order(str(user_id), round_key, self.etag, self.indices)
+
+    def answer_key(self, order=None, limit=None):
+        # Rebuild what a participant was served from the order alone
+        indices = self.indices if order is None else order
+        if limit is not None:
+            indices = indices[:limit]
+        return [
+            {'id': self.questions[i].get('id'), 'correctAnswer': self.questions[i].get('correctAnswer')}
+            for i in indices
+        ]
+
+    def render(self, order=None, limit=None):
+        # Join pre-encoded question fragments, optionally permuted and truncated
+        indices = self.indices if order is None else order
+        if limit is not None:
+            indices = indices[:limit]
+        return b'[' + b','.join(self.fragments[i] for i in indices) + b']'
+
+    def render_gzip(self, order=None, limit=None, level=9):
+        """``render`` as a gzip body, without compressing anything after the first call."""
+        pieces = self._gzip_pieces
+        if pieces is None:
+            # Each fragment as the first element ('[' + fragment) and as a later one (',' + fragment)
+            pieces = self._gzip_pieces = (
+                tuple(deflate_piece(b'[' + fragment, level) for fragment in self.fragments),
+                tuple(deflate_piece(b',' + fragment, level) for fragment in self.fragments),
+                deflate_piece(b']', level),
+                deflate_piece(b'[]', level)
+            )
+        first, rest, close, empty = pieces
+        indices = self.indices if order is None else order
+        if limit is not None:
+            indices = indices[:limit]
+        if not len(indices):
+            return gzip_stitch((empty,), b'[]')
+        stitched = [first[indices[0]]]
+        stitched.extend(rest[i] for i in indices[1:])
+        stitched.append(close)
+        return gzip_stitch(stitched, self.render(order, limit))
+
+
+class QuestionBank:
+    def __init__(self, store=None):
+        self._store = store
+        self._lock = threading.Lock()
+        # path -> (signature, questions)
+        self._entries = {}
+        # (path, key) -> (signature, PreparedPayload)
+        self._payloads = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _signature(self, path):
+        if self._store is not None and path in self._store:
+            # Bumped by every write to the bank, from any worker
+            return ('version', self._store.version(path))
+        # mtime + size is enough to notice edits made by other workers or by hand
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _forget(self, path):
+        self._entries.pop(path, None)
+        for payload_key in [k for k in self._payloads if k[0] == path]:
+            del self._payloads[payload_key]
+
+    def _load(self, path, signature):
+        # Caller has already counted the lookup; only the load happens here
+        if self._store is not None and path in self._store:
+            questions = self._store.load(path)
+        else:
+            with open(path, 'r') as file:
+                questions = tuple(json.load(file))
+        with self._lock:
+            self._entries[path] = (signature, questions)
+        return questions
+
+    def get(self, path):
+        """Return the questions in bank or file ``path`` as a tuple, or ``None`` if there are none.
+
+        The tuple and the question dicts inside it are shared between requests,
+        so callers must copy before mutating (``list(...)`` is enough to shuffle).
+        """
+        signature = self._signature(path)
+        if signature is None:
+            with self._lock:
+                self._forget(path)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+
+        return self._load(path, signature)
+
+    def get_payload(self, path, key='raw', transform=None, depends=()):
+        """Return a :class:`PreparedPayload` for ``path``, or ``None`` if the file is missing.
+
+        ``transform`` maps each question to the dict that should be sent to
+        clients; it runs once per bank version and ``key`` names the variant.
+        ``depends`` lists other files the transform reads: a change to any of
+        them also rebuilds the payload.
+        """
+        bank_signature = self._signature(path)
+        if bank_signature is None:
+            with self._lock:
+                self._forget(path)
+            return None
+        signature = (bank_signature, *(self._signature(other) for other in depends))
+
+        with self._lock:
+            cached = self._payloads.get((path, key))
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1]
+
+        questions = self.get(path)
+        if questions is None:
+            return None
+        if transform is not None:
+            questions = tuple(transform(q) for q in questions)
+        fragments = tuple(
+            json.dumps(q, separators=(',', ':')).encode('utf-8') for q in questions
+        )
+        payload = PreparedPayload(questions, fragments)
+
+        with self._lock:
+            self._payloads[(path, key)] = (signature, payload)
+        return payload
+
+    def invalidate(self, path=None):
+        # Drop one bank (or all of them) so the next read goes back to disk
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._payloads.clear()
+            else:
+                self._forget(path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'cached_banks': sorted(os.path.basename(path) for path in self._entries),
+                'prepared_payloads': sorted(f'{os.path.basename(path)}:{key}' for path, key in self._payloads),
+                'seeded_orders': _seeded_order.cache_info()._asdict()
+            }
@@ -0,0 +1,187 @@
+"""
+Round 2 questions discovered from the ``round2/`` folder layout.
+
+Each question is a numbered folder, e.g. ``round2/C/7/``, holding a prompt
+image (``P.png``, ``p.png``, ``P3.png``), four option images (``1.png`` ..
+``4.png`` or ``O1.png`` .. ``O4.png``) and an empty marker file whose name
+gives the answer letter. Marker names are written by hand and vary:
+``correct C (0).txt``, ``CorrectB(3).txt``, ``correct- D (counter = 6).txt``,
+``B-correct.txt``, ``b-CORRECT.txt``, ``B-corrent.txt``. Anything in
+parentheses is ignored.
+
+The scanner keeps each question folder's parsed result and re-reads a folder
+only when its mtime changes. Renaming, adding or removing a file changes the
+mtime, and so does adding or removing a question folder one level up. Folders
+are stat'ed at most once per ``min_interval`` seconds, so quiz requests do not
+touch the disk in between.
+"""
+import os
+import re
+import threading
+import time
+
+# Letter before or after "correct" (or the "corrent" typo), not part of a longer word
+_ANSWER_AFTER = re.compile(r'corre[cn]t[\s\-_:.]*([a-d])(?![a-z])', re.IGNORECASE)
+_ANSWER_BEFORE = re.compile(r'(?<![a-z])([a-d])[\s\-_:.]*corre[cn]t', re.IGNORECASE)
+_PROMPT = re.compile(r'p\d*', re.IGNORECASE)
+_OPTION = re.compile(r'o?([1-4])', re.IGNORECASE)
+_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+
+def parse_answer(filename):
+    """Index (A = 0) of the answer a marker file name gives, or ``None``."""
+    stem, extension = os.path.splitext(filename)
+    if extension.lower() != '.txt':
+        return None
+    # Notes in parentheses, e.g. the expected output in "CorrectB(false, No error)."
+    stem = re.sub(r'\([^)]*\)?', ' ', stem)
+    match = _ANSWER_AFTER.search(stem) or _ANSWER_BEFORE.search(stem)
+    if match is None:
+        return None
+    return 'abcd'.index(match.group(1).lower())
+
+
+def parse_folder(filenames):
+    """``(prompt, [option 1..4], answer index)`` from a question folder's file names.
+
+    Raises ValueError naming what is missing or ambiguous.
+    """
+    prompts = []
+    options = {}
+    answers = set()
+    for filename in filenames:
+        stem, extension = os.path.splitext(filename)
+        if extension.lower() in _IMAGE_EXTENSIONS:
+            if _PROMPT.fullmatch(stem):
+                prompts.append(filename)
+                continue
+            option = _OPTION.fullmatch(stem)
+            if option:
+                options.setdefault(int(option.group(1)), []).append(filename)
+            continue
+        answer = parse_answer(filename)
+        if answer is not None:
+            answers.add(answer)
+
+    if len(prompts) != 1:
+        raise ValueError(f'expected one prompt image (P.png), found {len(prompts)}')
+    for number in range(1, 5):
+        if len(options.get(number, [])) != 1:
+            raise ValueError(f'expected one image for option {number}, found {len(options.get(number, []))}')
+    if len(answers) != 1:
+        raise ValueError('no answer marker file' if not answers else 'answer marker files disagree')
+    return prompts[0], [options[number][0] for number in range(1, 5)], answers.pop()
+
+
+class QuestionFolders:
+    def __init__(self, root, folder, id_base, min_interval=5.0):
+        # Questions live in root/folder/<n>/ and get the id id_base + n
+        self.root = root
+        self.folder = folder
+        self.id_base = id_base
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._listing = None
+        # question folder -> (mtime_ns, question dict or None)
+        self._folders = {}
+        self._questions = ()
+        self.version = 0
+        self.scans = 0
+        self.parsed = 0
+        self.problems = {}
+
+    @property
+    def prefix(self):
+        """Logical path prefix shared by every question image from these folders."""
+        return f'round2/{self.folder}/'
+
+    def _read(self, number, directory):
+        # Parse one question folder; called with the lock held
+        self.parsed += 1
+        try:
+            prompt, options, answer = parse_folder(sorted(os.listdir(directory)))
+        except (OSError, ValueError) as e:
+            self.problems[directory] = str(e)
+            print(f"Skipping Round 2 question folder {directory}: {e}")
+            return None
+        self.problems.pop(directory, None)
+        base = f'{self.prefix}{number}/'
+        return {
+            'id': self.id_base + number,
+            'question': '',
+            'questionImage': base + prompt,
+            'options': [f'option {index}' for index in range(1, 5)],
+            'optionImages': [base + option for option in options],
+            'correctAnswer': answer
+        }
+
+    def scan(self, force=False):
+        """Return ``(questions, changed)``, re-reading only the folders that changed.
+
+        ``questions`` is a tuple sorted by id, ``changed`` is true when it differs
+        from the previous call's result (always true on the first call).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.min_interval:
+                return self._questions, False
+            first = self._checked_at is None
+            self._checked_at = now
+            self.scans += 1
+
+            language_root = os.path.join(self.root, self.folder)
+            try:
+                listing_mtime = os.stat(language_root).st_mtime_ns
+            except OSError:
+                listing_mtime = None
+            if self._listing is None or self._listing[0] != listing_mtime:
+                entries = []
+                if listing_mtime is not None:
+                    for name in os.listdir(language_root):
+                        directory = os.path.join(language_root, name)
+                        if name.isdigit() and os.path.isdir(directory):
+                            entries.append((int(name), directory))
+                self._listing = (listing_mtime, sorted(entries))
+
+            changed = first
+            folders = {}
+            for number, directory in self._listing[1]:
+                try:
+                    mtime = os.stat(directory).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self._folders.get(directory)
+                if cached is None or cached[0] != mtime:
+                    cached = (mtime, self._read(number, directory))
+                    changed = True
+                folders[directory] = cached
+            if set(folders) != set(self._folders):
+                changed = True
+            for directory in set(self.problems) - set(folders):
+                del self.problems[directory]
+            self._folders = folders
+
+            if changed:
+                questions = tuple(question for _, question in folders.values() if question is not None)
+                changed = first or questions != self._questions
+                self._questions = questions
+                if changed:
+                    self.version += 1
+            return self._questions, changed
+
+    def owns(self, question):
+        """Whether a bank entry was generated from these folders."""
+        image = question.get('questionImage') or ''
+        return image.casefold().startswith(self.prefix.casefold())
+
+    def stats(self):
+        with self._lock:
+            return {
+                'questions': len(self._questions),
+                'folders': len(self._folders),
+                'version': self.version,
+                'scans': self.scans,
+                'parsed': self.parsed,
+                'problems': dict(self.problems)
+            }
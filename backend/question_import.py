@@ -0,0 +1,152 @@
+"""
+Bulk question import.
+
+An upload is a JSON array or NDJSON (one question per line). Both are read
+incrementally from the request stream, so a large file is never held in
+memory as text. ``validate_question`` applies the same rules as the admin
+endpoints that add one question at a time. The app validates the upload
+and ingests any embedded images in one pass, then inserts every question
+with ``QuestionStore.add_many`` in a single transaction.
+"""
+import codecs
+import io
+import json
+import os
+
+IMPORT_FORMATS = ('json', 'ndjson')
+# Stop collecting error messages after this many; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_WHITESPACE = ' \t\n\r'
+
+
+def import_format(filename, mimetype):
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('.ndjson', '.jsonl') or mimetype in ('application/x-ndjson', 'application/jsonl'):
+        return 'ndjson'
+    if extension == '.json' or mimetype == 'application/json':
+        return 'json'
+    return None
+
+
+def _iter_json_array(stream, chunk_size):
+    # Decode one element at a time, reading more input only when an element is cut off
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        # At least double what is pending, so an element much larger than a chunk
+        # (an embedded image) is not re-decoded once per chunk
+        chunk = stream.read(max(chunk_size, len(buffer) - position))
+        eof = not chunk
+        buffer = buffer[position:] + text_decoder.decode(chunk or b'', final=eof)
+        position = 0
+
+    def next_token():
+        # The next non-whitespace character, or '' at the end of the input
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or eof:
+                return buffer[position] if position < len(buffer) else ''
+            fill()
+
+    if next_token() != '[':
+        yield 1, None, 'Expected a JSON array'
+        return
+    position += 1
+    number = 0
+    if next_token() == ']':
+        return
+    while True:
+        number += 1
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                value, end = None, None
+            # An element that runs to the end of the buffer may continue in the next chunk
+            if (end is None or end == len(buffer)) and not eof:
+                fill()
+                continue
+            break
+        if end is None:
+            yield number, None, 'Invalid JSON'
+            return
+        position = end
+        yield number, value, None
+        token = next_token()
+        if token == ']':
+            return
+        if token != ',':
+            yield number + 1, None, 'Expected "," or "]" after a question'
+            return
+        position += 1
+        next_token()
+
+
+def iter_questions(stream, import_format, chunk_size=65536):
+    """Yield ``(number, question, error)`` from a binary stream, one question at a time.
+
+    ``number`` is the position in the array, or the line number for NDJSON.
+    """
+    if import_format == 'json':
+        yield from _iter_json_array(stream, chunk_size)
+        return
+    if not hasattr(stream, 'read1'):
+        # Line iteration over a raw request stream reads in small pieces
+        stream = io.BufferedReader(stream, chunk_size)
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError:
+            yield number, None, 'Invalid JSON'
+
+
+def _answer_index(question, option_count):
+    answer = question.get('correctAnswer')
+    return isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < option_count
+
+
+def validate_question(question, round_number):
+    """Return ``(question, None)`` if it can be stored in a bank of this round, else ``(None, error)``."""
+    if not isinstance(question, dict):
+        return None, 'Question is not an object'
+    question_id = question.get('id')
+    if question_id is not None and (not isinstance(question_id, int) or isinstance(question_id, bool) or question_id < 1):
+        return None, 'id must be a positive integer'
+
+    if round_number == 3:
+        for field in ('question', 'options', 'correctAnswer'):
+            if field not in question:
+                return None, f'Missing required field: {field}'
+        if not isinstance(question['options'], list) or len(question['options']) < 2:
+            return None, 'options must be an array with at least 2 items'
+        if not _answer_index(question, len(question['options'])):
+            return None, 'correctAnswer must be a valid index into the options array'
+        return question, None
+
+    required_fields = ['question', 'options', 'correctAnswer']
+    if round_number == 2:
+        required_fields += ['questionImage', 'optionImages']
+    for field in required_fields:
+        if field not in question:
+            return None, f'Missing required field: {field}'
+    if not isinstance(question['options'], list) or len(question['options']) != 4:
+        return None, 'Options must be an array of 4 items'
+    if not _answer_index(question, 4):
+        return None, 'Correct answer must be an integer between 0 and 3'
+    if round_number == 2:
+        if not isinstance(question['optionImages'], list) or len(question['optionImages']) != 4:
+            return None, 'Option images must be an array of 4 items'
+        for image in [question['questionImage']] + question['optionImages']:
+            if image is not None and not isinstance(image, str):
+                return None, 'Images must be paths, URLs or data:image URLs'
+    return question, None
@@ -0,0 +1,246 @@
+"""
+Question banks stored in the database, one row per question.
+
+Admin edits used to read a whole bank file, change one entry and rewrite the
+file. That cost O(bank size) per edit, and two workers writing at once lost
+one of the edits. Each question is now a row keyed by ``(bank, question_id)``
+(a unique index), so adding or deleting one question touches one row.
+Concurrent writers are serialized by the database and can never clobber
+each other's edits, and a duplicate id fails the insert.
+
+Every write bumps the bank's shared version, so each worker's QuestionBank
+cache reloads the bank on its next read. The bank files remain the
+interchange format: ``import_file`` seeds a bank from one and ``export_file``
+writes a bank back in the same shape.
+"""
+import json
+import os
+from collections import Counter
+
+from sqlalchemy import delete, exc, func, insert, select, update
+
+from image_pipeline import atomic_write
+
+
+class DuplicateQuestion(Exception):
+    pass
+
+
+def _encode(question):
+    return json.dumps(question, separators=(',', ':'))
+
+
+class QuestionStore:
+    def __init__(self, engine, table, version_for, banks):
+        # version_for(name) returns the shared version counter for that name;
+        # banks maps bank name -> the JSON file it is imported from and exported to
+        self._engine = engine
+        self._table = table
+        self._version_for = version_for
+        self.banks = dict(banks)
+        self._versions = {}
+
+    def __contains__(self, bank):
+        return bank in self.banks
+
+    def _version(self, bank):
+        version = self._versions.get(bank)
+        if version is None:
+            version = self._versions[bank] = self._version_for(f'questions_{bank}')
+        return version
+
+    def version(self, bank):
+        return self._version(bank).current()
+
+    def load(self, bank):
+        """The bank's questions ordered by id, or ``None`` if it has none."""
+        table = self._table
+        with self._engine.connect() as connection:
+            rows = connection.execute(
+                select(table.c.data).where(table.c.bank == bank).order_by(table.c.question_id)
+            ).scalars().all()
+        return tuple(json.loads(data) for data in rows) or None
+
+    def get(self, bank, question_id):
+        table = self._table
+        with self._engine.connect() as connection:
+            data = connection.execute(
+                select(table.c.data).where(table.c.bank == bank, table.c.question_id == question_id)
+            ).scalar()
+        return json.loads(data) if data is not None else None
+
+    def count(self, bank):
+        table = self._table
+        with self._engine.connect() as connection:
+            return connection.execute(select(func.count()).where(table.c.bank == bank)).scalar()
+
+    def next_id(self, bank, connection=None):
+        if connection is None:
+            with self._engine.connect() as connection:
+                return self.next_id(bank, connection)
+        table = self._table
+        # Served by the (bank, question_id) index
+        current = connection.execute(select(func.max(table.c.question_id)).where(table.c.bank == bank)).scalar()
+        return (current or 0) + 1
+
+    def add(self, bank, question, renumber=False):
+        """Insert one question and return it with its id.
+
+        A question without an id gets the next free one. With ``renumber`` a
+        question whose id was taken in the meantime gets the next free one too.
+        Otherwise a taken id raises DuplicateQuestion.
+        """
+        question = dict(question)
+        assign = question.get('id') is None
+        for _ in range(5):
+            try:
+                with self._engine.begin() as connection:
+                    if assign:
+                        question['id'] = self.next_id(bank, connection)
+                    connection.execute(insert(self._table).values(
+                        bank=bank, question_id=question['id'], data=_encode(question)
+                    ))
+                break
+            except exc.IntegrityError:
+                # Another admin took this id between our read and our insert
+                if not (assign or renumber):
+                    raise DuplicateQuestion(f"Question with ID {question['id']} already exists")
+                assign = True
+        else:
+            raise RuntimeError(f'Could not find a free question ID in {bank}')
+        self._version(bank).bump()
+        return question
+
+    def add_many(self, bank, questions):
+        """Insert a batch of questions in one transaction and return them with their ids.
+
+        Questions without an id are numbered in order after the highest id in
+        the bank or the batch. If any explicit id is already taken (or repeated in the batch)
+        nothing is inserted and DuplicateQuestion is raised.
+        """
+        table = self._table
+        questions = [dict(question) for question in questions]
+        explicit = [question['id'] for question in questions if question.get('id') is not None]
+        if len(explicit) != len(set(explicit)):
+            repeated = sorted(question_id for question_id, count in Counter(explicit).items() if count > 1)
+            raise DuplicateQuestion(f'Question IDs repeated in the import: {repeated[:10]}')
+        assign = [question for question in questions if question.get('id') is None]
+        for _ in range(5):
+            try:
+                with self._engine.begin() as connection:
+                    taken = []
+                    # Chunked to stay under the database's bound parameter limit
+                    for start in range(0, len(explicit), 500):
+                        taken += connection.execute(select(table.c.question_id).where(
+                            table.c.bank == bank, table.c.question_id.in_(explicit[start:start + 500])
+                        )).scalars().all()
+                    if taken:
+                        raise DuplicateQuestion(f'Question IDs already exist: {sorted(taken)[:10]}')
+                    next_id = max([self.next_id(bank, connection) - 1] + explicit) + 1
+                    for offset, question in enumerate(assign):
+                        question['id'] = next_id + offset
+                    if questions:
+                        connection.execute(insert(table), [
+                            {'bank': bank, 'question_id': question['id'], 'data': _encode(question)}
+                            for question in questions
+                        ])
+                break
+            except exc.IntegrityError:
+                # Another admin added a question between our read and our insert
+                continue
+        else:
+            raise RuntimeError(f'Could not find free question IDs in {bank}')
+        if questions:
+            self._version(bank).bump()
+        return questions
+
+    def iter_data(self, bank, batch_size=1000):
+        """Yield each stored question's JSON text in id order, without decoding it."""
+        table = self._table
+        last = None
+        while True:
+            query = select(table.c.question_id, table.c.data).where(table.c.bank == bank)
+            if last is not None:
+                query = query.where(table.c.question_id > last)
+            with self._engine.connect() as connection:
+                rows = connection.execute(query.order_by(table.c.question_id).limit(batch_size)).all()
+            for question_id, data in rows:
+                yield data
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def delete(self, bank, question_id):
+        """Delete one question and return it, or ``None`` if there is no such question."""
+        table = self._table
+        match = (table.c.bank == bank) & (table.c.question_id == question_id)
+        with self._engine.begin() as connection:
+            data = connection.execute(select(table.c.data).where(match)).scalar()
+            if data is None:
+                return None
+            connection.execute(delete(table).where(match))
+        self._version(bank).bump()
+        return json.loads(data)
+
+    def replace(self, bank, questions, owns=None):
+        """Make the bank hold exactly ``questions`` (each with an id), in one transaction.
+
+        With ``owns``, a function of a stored question, only the rows it accepts
+        are replaced. It is applied to the rows as stored inside the transaction,
+        so every other row is left as it is, including rows added since the
+        caller read the bank, and a question whose id such a row holds is not
+        written. Only rows that differ are written. Returns the number of rows
+        inserted, updated or deleted.
+        """
+        table = self._table
+        wanted = {question['id']: _encode(question) for question in questions}
+        changes = 0
+        with self._engine.begin() as connection:
+            stored = dict(connection.execute(
+                select(table.c.question_id, table.c.data).where(table.c.bank == bank)
+            ).all())
+            if owns is not None:
+                others = {question_id for question_id, data in stored.items() if not owns(json.loads(data))}
+                stored = {question_id: data for question_id, data in stored.items() if question_id not in others}
+                wanted = {question_id: data for question_id, data in wanted.items() if question_id not in others}
+            removed = [question_id for question_id in stored if question_id not in wanted]
+            if removed:
+                connection.execute(delete(table).where(table.c.bank == bank, table.c.question_id.in_(removed)))
+            added = [{'bank': bank, 'question_id': question_id, 'data': data}
+                     for question_id, data in wanted.items() if question_id not in stored]
+            if added:
+                connection.execute(insert(table), added)
+            for question_id, data in wanted.items():
+                if question_id in stored and stored[question_id] != data:
+                    connection.execute(update(table).where(
+                        table.c.bank == bank, table.c.question_id == question_id
+                    ).values(data=data))
+                    changes += 1
+            changes += len(removed) + len(added)
+        if changes:
+            self._version(bank).bump()
+        return changes
+
+    def import_file(self, bank, path=None):
+        """Replace the bank with the questions in its JSON file; returns how many there are.
+
+        Questions without an id (Round 3) are numbered in file order.
+        """
+        path = path or self.banks[bank]
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'r') as file:
+            questions = [dict(question) for question in json.load(file)]
+        next_id = max((q['id'] for q in questions if isinstance(q.get('id'), int)), default=0) + 1
+        for question in questions:
+            if not isinstance(question.get('id'), int):
+                question['id'] = next_id
+                next_id += 1
+        self.replace(bank, questions)
+        return len(questions)
+
+    def export_file(self, bank, path=None):
+        """Write the bank to its JSON file (atomically); returns how many questions were written."""
+        questions = list(self.load(bank) or ())
+        atomic_write(path or self.banks[bank], json.dumps(questions, indent=2).encode('utf-8'))
+        return len(questions)
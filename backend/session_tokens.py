@@ -0,0 +1,32 @@
+"""
+Signed, short-lived session tokens.
+
+A token is a small payload signed with the app's secret key and a timestamp,
+so the server can trust it without storing anything. Tokens expire after
+``max_age`` seconds; without a secret key no tokens are issued at all.
+"""
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+
+class SessionTokens:
+    def __init__(self, secret_key, max_age, salt='quiz-session'):
+        self.max_age = max_age
+        self._serializer = URLSafeTimedSerializer(secret_key, salt=salt) if secret_key else None
+
+    @property
+    def enabled(self):
+        return self._serializer is not None
+
+    def issue(self, payload):
+        if not self.enabled:
+            return None
+        return self._serializer.dumps(payload)
+
+    def verify(self, token):
+        # Returns the payload, or None for a missing, tampered or expired token
+        if not self.enabled or not token:
+            return None
+        try:
+            return self._serializer.loads(token, max_age=self.max_age)
+        except BadSignature:
+            return None
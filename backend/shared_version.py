@@ -0,0 +1,132 @@
+"""
+Version counters shared by every worker process.
+
+Gunicorn workers each keep their own in-memory caches; bumping a shared
+version after a write tells the other workers their copy is stale.
+SharedVersion covers the workers of one machine, DatabaseVersion every
+app server that talks to the same database. Either can also hold a small
+payload (e.g. the last background job run) that every worker reads back.
+"""
+import os
+import threading
+
+from sqlalchemy import exc, insert, select, update
+
+
+class SharedVersion:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def current(self):
+        # The file grows by one byte per bump, so reading the version is one stat()
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def bump(self):
+        # O_APPEND writes are atomic, so concurrent bumps from other workers are never lost
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, b'.')
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def store(self, payload):
+        # Kept beside the counter and replaced atomically, so readers never see half of it
+        temporary = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as file:
+            file.write(payload)
+        os.replace(temporary, self.path + '.payload')
+        return self.bump()
+
+    def load(self):
+        try:
+            with open(self.path + '.payload') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+
+class DatabaseVersion:
+    """A named counter row in ``table`` (columns ``name``, ``version`` and ``payload``)."""
+
+    def __init__(self, engine, table, name):
+        self._engine = engine
+        self._table = table
+        self.name = name
+
+    def current(self):
+        with self._engine.connect() as connection:
+            version = connection.execute(
+                select(self._table.c.version).where(self._table.c.name == self.name)
+            ).scalar()
+        return version or 0
+
+    def bump(self, **values):
+        # The increment happens in the database, so concurrent bumps from other nodes are never lost
+        table = self._table
+        for _ in range(2):
+            try:
+                with self._engine.begin() as connection:
+                    version = connection.execute(
+                        update(table).where(table.c.name == self.name)
+                        .values(version=table.c.version + 1, **values).returning(table.c.version)
+                    ).scalar()
+                    if version is None:
+                        connection.execute(insert(table).values(name=self.name, version=1, **values))
+                        version = 1
+                    return version
+            except exc.IntegrityError:
+                # Another node inserted the first row at the same time; update it instead
+                continue
+        raise RuntimeError(f'Could not bump shared version {self.name}')
+
+    def store(self, payload):
+        return self.bump(payload=payload)
+
+    def load(self):
+        with self._engine.connect() as connection:
+            return connection.execute(
+                select(self._table.c.payload).where(self._table.c.name == self.name)
+            ).scalar()
+
+
+class VersionedCache:
+    """A value loaded once per worker and reloaded when the shared version moves."""
+
+    def __init__(self, loader, version):
+        self._loader = loader
+        self._version = version
+        self._lock = threading.Lock()
+        self._seen = None
+        self._value = None
+        self.hits = 0
+        self.reloads = 0
+
+    def get(self):
+        # Returns (value, version); costs one version read while nothing has changed
+        current = self._version.current()
+        with self._lock:
+            if current == self._seen:
+                self.hits += 1
+                return self._value, current
+        # Read the version before loading so a concurrent write forces another reload
+        value = self._loader()
+        with self._lock:
+            self._value = value
+            self._seen = current
+            self.reloads += 1
+        return value, current
+
+    def invalidate(self):
+        # Call after committing a change so every worker reloads on its next read
+        with self._lock:
+            self._seen = None
+        return self._version.bump()
+
+    def stats(self):
+        with self._lock:
+            return {'version': self._seen, 'hits': self.hits, 'reloads': self.reloads}
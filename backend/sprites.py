@@ -0,0 +1,176 @@
+"""
+Sprite sheets for Round 2 questions.
+
+A Round 2 question shows up to five images (the prompt and four options),
+and each one used to be a separate request. The build step stacks a
+question's images into one sheet and records where each image sits, so a
+participant fetches one file per question and the page crops it with CSS.
+
+Sheets are named by a hash of their source images, and the manifest records
+the source paths and content hashes. A rebuild only renders questions whose
+images changed and deletes the sheets nothing refers to any more. Entries
+whose sources changed since the last build are ignored by the quiz payload,
+which falls back to the separate images until the next build.
+
+Workers build into the same directory, so a build runs under ``lock``:
+otherwise one build could delete a sheet another has just written and put
+in its manifest.
+
+Needs Pillow; without it no sheets are built.
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: development only, a single process builds
+    fcntl = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow not installed: questions keep their separate images
+    Image = None
+
+from image_pipeline import atomic_write, write_once
+
+# Transparent rows between stacked images, so a scaled crop never shows its neighbour's edge
+SHEET_GAP = 2
+
+
+def pack(sizes, gap=SHEET_GAP):
+    """Stack ``(width, height)`` boxes top to bottom, left aligned.
+
+    Returns ``(sheet width, sheet height, [(x, y), ...])``.
+    """
+    offsets = []
+    y = 0
+    for _, height in sizes:
+        offsets.append((0, y))
+        y += height + gap
+    width = max((width for width, _ in sizes), default=0)
+    return width, max(y - gap, 0), offsets
+
+
+def write_manifest(path, records):
+    atomic_write(path, json.dumps(records, indent=2).encode('utf-8'))
+
+
+class SpriteBuilder:
+    def __init__(self, directory, url_prefix, max_width=1280, image_format='png'):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.max_width = max_width
+        # Sheets are lossless either way: Round 2 images are screenshots of code
+        self.format = image_format if image_format in ('png', 'webp') else 'png'
+
+    def _current(self, record, sources):
+        # An earlier record is reusable when it was built from the same files and still exists
+        return (
+            record is not None
+            and record.get('sources') == [source and source[0] for source in sources]
+            and record.get('digests') == [source and source[2] for source in sources]
+            and os.path.exists(self.file(record))
+        )
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Hold the directory's build lock; builds and manifest writes in every process take turns."""
+        os.makedirs(self.directory, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, '.build.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def file(self, record):
+        """Real path of a record's sheet."""
+        return os.path.join(self.directory, os.path.basename(record['path']))
+
+    def _render(self, question_id, sources):
+        images = []
+        for source in sources:
+            if source is None:
+                images.append(None)
+                continue
+            with Image.open(source[1]) as image:
+                image = image.convert('RGBA')
+            if image.width > self.max_width:
+                height = max(1, round(image.height * self.max_width / image.width))
+                image = image.resize((self.max_width, height), Image.LANCZOS)
+            images.append(image)
+
+        present = [image for image in images if image is not None]
+        width, height, offsets = pack([image.size for image in present])
+        sheet = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+        regions = []
+        placed = iter(zip(present, offsets))
+        for image in images:
+            if image is None:
+                regions.append(None)
+                continue
+            image, (x, y) = next(placed)
+            sheet.paste(image, (x, y))
+            regions.append({'x': x, 'y': y, 'width': image.width, 'height': image.height})
+
+        encoded = io.BytesIO()
+        if self.format == 'webp':
+            sheet.save(encoded, 'WEBP', lossless=True, quality=100, method=4)
+        else:
+            sheet.save(encoded, 'PNG', optimize=True)
+        digest = hashlib.sha256('|'.join(source[2] for source in sources if source).encode('utf-8')).hexdigest()[:16]
+        filename = f'q{question_id}-{digest}.{self.format}'
+        path = os.path.join(self.directory, filename)
+        write_once(path, encoded.getvalue())
+        return {
+            'id': question_id,
+            'path': f'{self.url_prefix}/{filename}',
+            'width': width,
+            'height': height,
+            'sources': [source and source[0] for source in sources],
+            'digests': [source and source[2] for source in sources],
+            'regions': regions
+        }
+
+    def build(self, entries, previous=()):
+        """Build a sheet for every ``(question id, sources)`` in ``entries``.
+
+        ``sources`` lists each image slot (prompt first, then the options) as
+        ``(logical path, real path, content hash)``, or ``None`` for a slot with
+        no local file. Records in ``previous`` whose sources are unchanged are
+        reused. Questions with fewer than two images get no sheet. Sheets no
+        record refers to are deleted, so call it under ``lock``. Returns
+        ``(records, stats)``.
+        """
+        if Image is None:
+            return [], {'built': 0, 'reused': 0, 'removed': 0, 'skipped': 0}
+        os.makedirs(self.directory, exist_ok=True)
+        previous = {record.get('id'): record for record in previous}
+        records = []
+        built = reused = skipped = 0
+        for question_id, sources in entries:
+            if sum(source is not None for source in sources) < 2:
+                skipped += 1
+                continue
+            record = previous.get(question_id)
+            if self._current(record, sources):
+                reused += 1
+            else:
+                record = self._render(question_id, sources)
+                built += 1
+            records.append(record)
+
+        # Sheets of deleted or changed questions
+        keep = {os.path.basename(record['path']) for record in records}
+        removed = 0
+        for filename in os.listdir(self.directory):
+            if filename.endswith(('.png', '.webp')) and filename not in keep:
+                os.remove(os.path.join(self.directory, filename))
+                removed += 1
+        return records, {'built': built, 'reused': reused, 'removed': removed, 'skipped': skipped}
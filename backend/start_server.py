@@ -17,22 +17,47 @@ import sys
 cpu_count = multiprocessing.cpu_count()
 workers = (2 * cpu_count) + 1
 
+# Threads per worker serving ordinary API requests; the app sizes its database
+# connection pool from this
+threads = int(os.getenv('GUNICORN_THREADS', '2'))
+os.environ['GUNICORN_THREADS'] = str(threads)
+
+# Each open /api/events/stream connection holds a worker thread for its lifetime.
+# Live events are off unless LIVE_EVENTS is set; then every worker runs threaded
+# (gthread) with EVENT_STREAM_THREADS extra threads for streams, and the app turns
+# away streams beyond that so they never take the request threads. Capacity is
+# workers * EVENT_STREAM_THREADS open streams; clients past it fall back to polling.
+live_events = os.getenv('LIVE_EVENTS', 'false').lower() in ('1', 'true', 'yes')
+stream_threads = int(os.getenv('EVENT_STREAM_THREADS', '50')) if live_events else 0
+os.environ['EVENT_STREAM_THREADS'] = str(stream_threads)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread' if live_events else 'sync')
+
 print(f"Starting server with {workers} workers (based on {cpu_count} CPU cores)")
+if live_events:
+    print(f"Live events enabled: up to {workers * stream_threads} open event streams")
 print("This configuration is optimized for handling 30-35 concurrent users")
 
+# Apply schema migrations and add missing accounts once for this deployment, so the
+# workers below start without doing any database setup of their own
+print("Migrating database...")
+migrate = subprocess.run([sys.executable, "-m", "flask", "--app", "app", "migrate"])
+if migrate.returncode != 0:
+    print("Database migration failed, not starting the server")
+    sys.exit(migrate.returncode)
+
 # Command to start Gunicorn
 # - workers: number of worker processes
 # - threads: threads per worker (increasing concurrency)
 # - timeout: timeout for worker processes (increased for long requests)
 # - bind: IP and port to bind to
-# - worker-class: sync for simplicity, gevent for more concurrent connections
+# - worker-class: sync for simplicity, gthread when event streams need their own threads
 cmd = [
     "gunicorn",
     "--workers", str(workers),
-    "--threads", "2",
+    "--threads", str(threads + stream_threads),
     "--timeout", "120",
     "--bind", "0.0.0.0:5000",
-    "--worker-class", "sync",
+    "--worker-class", worker_class,
     "app:app"
 ]
 
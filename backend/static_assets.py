@@ -0,0 +1,146 @@
+"""
+Manifest of the static files served to participants (Round 2 question images
+and uploaded question/option images).
+
+Each worker indexes the asset folders once at startup. Logical paths such as
+``round2/C/1/P.png`` map to the real file, case-insensitively, so
+``round2/c/1/p.png`` finds it too. A request is answered from the index, and
+only a miss looks at the disk: it stats the folder the file would be in and
+re-scans that folder if it changed since it was indexed.
+
+Only image files are indexed, so nothing else in those folders (such as
+the Round 2 answer marker files) can be fetched.
+
+Content hashes are computed lazily, once per file version. ``url`` embeds
+them in the path, so clients and proxies may cache a file forever.
+"""
+import hashlib
+import os
+import threading
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg')
+
+
+def normalize(logical_path):
+    # Case-folded, forward slashes, no empty or '.' segments
+    parts = logical_path.replace('\\', '/').split('/')
+    return '/'.join(part for part in parts if part not in ('', '.')).casefold()
+
+
+class AssetManifest:
+    def __init__(self, roots, extensions=IMAGE_EXTENSIONS):
+        # (logical prefix, directory) pairs; an earlier root wins when two hold the same path
+        self._roots = [(prefix.strip('/'), os.path.abspath(directory)) for prefix, directory in roots]
+        self._extensions = tuple(extensions)
+        self._lock = threading.Lock()
+        # normalized logical path -> (root index, real path)
+        self._files = {}
+        # normalized logical folder -> {real directory: (root index, mtime_ns when scanned)}
+        self._dirs = {}
+        # real path -> ((mtime_ns, size), digest)
+        self._digests = {}
+        self.scans = 0
+
+    def build(self):
+        with self._lock:
+            self._files = {}
+            self._dirs = {}
+            for root_index, (_, directory) in enumerate(self._roots):
+                self._scan(root_index, directory)
+        return self
+
+    def _logical(self, root_index, path):
+        prefix, root = self._roots[root_index]
+        relative = os.path.relpath(path, root)
+        return normalize(prefix if relative == '.' else f'{prefix}/{relative}')
+
+    def _scan(self, root_index, directory):
+        # Index every file under directory; called with the lock held
+        self.scans += 1
+        for dirpath, _, filenames in os.walk(directory):
+            try:
+                mtime = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            folder = self._logical(root_index, dirpath)
+            self._dirs.setdefault(folder, {})[dirpath] = (root_index, mtime)
+            for filename in filenames:
+                if not filename.lower().endswith(self._extensions):
+                    continue
+                key = f'{folder}/{filename.casefold()}' if folder else filename.casefold()
+                indexed = self._files.get(key)
+                if indexed is None or indexed[0] >= root_index:
+                    self._files[key] = (root_index, os.path.join(dirpath, filename))
+
+    def _refresh(self, key):
+        # Re-scan the nearest indexed folder above key if it changed; called with the lock held
+        folder = key.rsplit('/', 1)[0] if '/' in key else ''
+        while folder not in self._dirs:
+            if not folder:
+                return False
+            folder = folder.rsplit('/', 1)[0] if '/' in folder else ''
+        changed = False
+        for directory, (root_index, mtime) in list(self._dirs[folder].items()):
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            if current != mtime:
+                self._scan(root_index, directory)
+                changed = True
+        return changed
+
+    def resolve(self, logical_path):
+        """Real path of ``logical_path``, or ``None`` if there is no such file."""
+        key = normalize(logical_path)
+        with self._lock:
+            indexed = self._files.get(key)
+            if indexed is None and self._refresh(key):
+                indexed = self._files.get(key)
+        if indexed is None:
+            return None
+        if not os.path.isfile(indexed[1]):
+            # Deleted since it was indexed
+            with self._lock:
+                self._files.pop(key, None)
+            return None
+        return indexed[1]
+
+    def add(self, path):
+        """Index a file just written under one of the roots."""
+        path = os.path.abspath(path)
+        if not path.lower().endswith(self._extensions):
+            return
+        with self._lock:
+            for root_index, (_, root) in enumerate(self._roots):
+                if path.startswith(root + os.sep):
+                    key = self._logical(root_index, path)
+                    indexed = self._files.get(key)
+                    if indexed is None or indexed[0] >= root_index:
+                        self._files[key] = (root_index, path)
+
+    def digest(self, path):
+        """Short content hash of a real file, recomputed only when it changes."""
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with open(path, 'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()[:16]
+        with self._lock:
+            self._digests[path] = (signature, digest)
+        return digest
+
+    def url(self, logical_path):
+        """``assets/<content hash>/<logical path>``, or the path unchanged if there is no such file."""
+        path = self.resolve(logical_path)
+        if path is None:
+            return logical_path
+        return f'assets/{self.digest(path)}/{logical_path.lstrip("/")}'
+
+    def stats(self):
+        with self._lock:
+            return {'files': len(self._files), 'folders': len(self._dirs), 'scans': self.scans,
+                    'hashed': len(self._digests)}
@@ -55,6 +55,7 @@ const AdminDashboard = () => {
     const [newParticipantUsername, setNewParticipantUsername] = useState('');
     const [newParticipantPassword, setNewParticipantPassword] = useState('');
     const [isCreatingParticipant, setIsCreatingParticipant] = useState(false);
+    const [isImportingRoster, setIsImportingRoster] = useState(false);
     
     // Validation and notification states
     const [errors, setErrors] = useState({});
@@ -558,6 +559,48 @@ const AdminDashboard = () => {
         }
     };
 
+    // Function to import many participants from a CSV or NDJSON roster file
+    const handleImportRoster = async (e) => {
+        const file = e.target.files[0];
+        e.target.value = '';
+        if (!file) return;
+        
+        setIsImportingRoster(true);
+        
+        try {
+            const formData = new FormData();
+            formData.append('file', file);
+            
+            // The server streams one line per failed row, then a summary line
+            const response = await axios.post(
+                `${apiUrl}/api/admin/participants/import?admin_id=${user.id}&report=errors`,
+                formData,
+                { responseType: 'text' }
+            );
+            const lines = response.data.trim().split('\n').map((line) => JSON.parse(line));
+            const failure = lines.find((line) => line.error && !line.row);
+            const summary = (lines.find((line) => line.summary) || {}).summary;
+            if (failure || !summary) throw new Error(failure ? failure.error : 'Import did not finish');
+            lines.filter((line) => line.row).forEach((line) => console.warn(`Roster row ${line.row}: ${line.error}`));
+            
+            setSnackbar({
+                open: true,
+                message: `Imported ${summary.created} participants (${summary.existing} existing, ${summary.duplicate} duplicate, ${summary.invalid} invalid)`,
+                severity: summary.invalid || summary.duplicate ? 'warning' : 'success'
+            });
+            setShowCreateParticipantForm(false);
+        } catch (error) {
+            console.error('Error importing participants:', error);
+            setSnackbar({
+                open: true,
+                message: error.response?.data?.error || error.message || 'Failed to import participants',
+                severity: 'error'
+            });
+        } finally {
+            setIsImportingRoster(false);
+        }
+    };
+
     return (
         <Box sx={{ 
             width: '100%',
@@ -1755,6 +1798,20 @@ const AdminDashboard = () => {
                             </Button>
                         </Box>
                     </form>
+                    
+                    <Divider sx={{ my: 3 }} />
+                    <Typography variant="body2" color="text.secondary" sx={{ mb: 2 }}>
+                        Or import a roster file: CSV with an enrollment_no,username,password header, or NDJSON.
+                    </Typography>
+                    <Button
+                        variant="outlined"
+                        component="label"
+                        disabled={isImportingRoster}
+                        startIcon={isImportingRoster ? <CircularProgress size={20} /> : null}
+                    >
+                        {isImportingRoster ? 'Importing...' : 'Import Roster File'}
+                        <input type="file" hidden accept=".csv,.ndjson,.jsonl" onChange={handleImportRoster} />
+                    </Button>
                 </DialogContent>
             </Dialog>
             
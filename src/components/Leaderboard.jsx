@@ -65,7 +65,9 @@ const Leaderboard = ({ isAdmin }) => {
       // Fetch leaderboard data
       const response = await axios.get(`${apiUrl}/api/leaderboard`, {
         params: {
-          requesting_user_id: loggedInUser ? loggedInUser.id : null
+          requesting_user_id: loggedInUser ? loggedInUser.id : null,
+          // Only the columns this table renders
+          fields: 'rank,user_id,username,enrollment_no,total_score,total_questions,percentage,current_round,qualified_for_round3'
         }
       });
       
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { 
   Container, 
   Typography, 
@@ -70,6 +70,34 @@ const Login = () => {
   const [error, setError] = useState('');
   const [loading, setLoading] = useState(false);
 
+  const completeLogin = (data) => {
+    // Store user data and the session token in localStorage
+    localStorage.setItem('user', JSON.stringify(data.user));
+    if (data.token) {
+      localStorage.setItem('session_token', data.token);
+    }
+    
+    // Redirect to appropriate dashboard
+    if (data.user.is_admin) {
+      navigate('/admin-dashboard');
+    } else {
+      navigate('/participant-dashboard');
+    }
+  };
+
+  // Log straight back in with the session token from an earlier login, without the password
+  useEffect(() => {
+    const token = localStorage.getItem('session_token');
+    if (!token) {
+      return;
+    }
+    setLoading(true);
+    axios.post(`${apiUrl}/api/login`, { token })
+      .then((response) => completeLogin(response.data))
+      .catch(() => localStorage.removeItem('session_token'))
+      .finally(() => setLoading(false));
+  }, []);
+
   const handleLogin = async (e) => {
     e.preventDefault();
     
@@ -87,15 +115,7 @@ const Login = () => {
         password: password
       });
       
-      // Store user data in localStorage
-      localStorage.setItem('user', JSON.stringify(response.data.user));
-      
-      // Redirect to appropriate dashboard
-      if (response.data.user.is_admin) {
-        navigate('/admin-dashboard');
-      } else {
-        navigate('/participant-dashboard');
-      }
+      completeLogin(response.data);
     } catch (error) {
       console.error('Login error:', error);
       setError(error.response?.data?.error || 'Failed to login. Please try again.');
@@ -88,6 +88,7 @@ const Navbar = ({ isAdmin }) => {
 
     const handleLogout = () => {
         localStorage.removeItem('user');
+        localStorage.removeItem('session_token');
         navigate('/login');
     };
 
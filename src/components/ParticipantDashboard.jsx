@@ -1,8 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { Container, Typography, Box, Paper, Button, Grid, CircularProgress, Chip, Snackbar, Alert } from '@mui/material';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import Navbar from './Navbar';
+import { fetchRoundsAccess, useLiveEvents } from '../liveEvents';
 
 const apiUrl = import.meta.env.VITE_API_URL;
 
@@ -23,7 +24,8 @@ const ParticipantDashboard = () => {
         message: '',
         severity: 'info'
     });
-    const [previousAccess, setPreviousAccess] = useState({
+    // Last access state seen, read by the stream handlers without re-subscribing
+    const previousAccessRef = useRef({
         round1: { enabled: false },
         round2: { enabled: false },
         round3: { enabled: false }
@@ -50,8 +52,9 @@ const ParticipantDashboard = () => {
     };
 
     // Check for access changes and show notifications
-    const handleAccessChange = (newAccess) => {
+    const handleAccessChange = useCallback((newAccess) => {
         // Check for changes in access status
+        const previousAccess = previousAccessRef.current;
         let hasChanges = false;
         let changeMessage = '';
         let changeSeverity = 'info';
@@ -82,8 +85,8 @@ const ParticipantDashboard = () => {
         }
 
         // Update previous access for next comparison
-        setPreviousAccess(newAccess);
-    };
+        previousAccessRef.current = newAccess;
+    }, []);
 
     useEffect(() => {
         const fetchUserData = async () => {
@@ -110,7 +113,7 @@ const ParticipantDashboard = () => {
                     // Check rounds access status
                     const access = await checkRoundsAccess();
                     setRoundsAccess(access);
-                    setPreviousAccess(access); // Initialize previous access
+                    previousAccessRef.current = access; // Initialize previous access
                     
                     // Get user results to know which rounds are already attempted
                     try {
@@ -162,33 +165,43 @@ const ParticipantDashboard = () => {
         fetchUserData();
     }, [navigate]);
 
-    // Enhanced polling for round access - continuous polling whether waiting or not
-    useEffect(() => {
-        let intervalId;
+    // Round access updates - pushed by the server when supported, polled otherwise.
+    // The server sends the current state whenever the stream (re)connects.
+    const userId = user?.id;
+    const applyAccess = (access) => {
+        // Compare with previous state to detect changes
+        const previous = previousAccessRef.current;
+        const hasChanged = 
+            access.round1.enabled !== previous.round1.enabled ||
+            access.round2.enabled !== previous.round2.enabled ||
+            access.round3.enabled !== previous.round3.enabled;
         
-        if (user) {
-            // Set up continuous polling
-            intervalId = setInterval(async () => {
-                const access = await checkRoundsAccess();
-                
-                // Compare with previous state to detect changes
-                const hasChanged = 
-                    access.round1.enabled !== roundsAccess.round1.enabled ||
-                    access.round2.enabled !== roundsAccess.round2.enabled ||
-                    access.round3.enabled !== roundsAccess.round3.enabled;
-                
-                if (hasChanged) {
-                    console.log("Round access status changed:", access);
-                    handleAccessChange(access);
-                    setRoundsAccess(access);
+        if (hasChanged) {
+            console.log("Round access status changed:", access);
+            handleAccessChange(access);
+            setRoundsAccess(access);
+        }
+    };
+    
+    // Qualification passes and scored submissions change this participant's own record
+    const refreshUser = async () => {
+        try {
+            const userResponse = await axios.get(`/api/user/${userId}`, {
+                params: {
+                    requesting_user_id: userId
                 }
-            }, 5000); // Check every 5 seconds for more responsiveness
+            });
+            setUser(userResponse.data);
+        } catch (error) {
+            console.error('Error refreshing user data:', error);
         }
-        
-        return () => {
-            if (intervalId) clearInterval(intervalId);
-        };
-    }, [user, roundsAccess, handleAccessChange]);
+    };
+    
+    useLiveEvents(userId, {
+        round_access: applyAccess,
+        qualifications: refreshUser,
+        submission_scored: refreshUser
+    }, { pollers: { round_access: fetchRoundsAccess } });
 
     // In the startRound function
     const startRound = (roundNumber) => {
@@ -10,6 +10,7 @@ import {
 } from '@mui/material';
 import axios from 'axios';
 import Navbar from './Navbar';
+import { fetchRoundsAccess, useLiveEvents } from '../liveEvents';
 
 const apiUrl = import.meta.env.VITE_API_URL;
 
@@ -49,45 +50,36 @@ const Round1 = () => {
     }
   }, [navigate, step]);
   
-  // Enhanced polling - check access status even during language selection
-  useEffect(() => {
-    let intervalId;
+  // Access changes on the language selection screen or during the quiz - pushed over
+  // live events, polled every 5 seconds when the stream is unavailable
+  const applyRoundAccess = (access) => {
+    const enabled = access?.round1?.enabled || false;
     
-    // Only poll if on language selection screen or during quiz
-    if ((step === 'language-select' || step === 'quiz') && user && !user.is_admin) {
-      // Set up polling
-      intervalId = setInterval(async () => {
-        const enabled = await checkRoundAccess();
-        
-        // If access status changed, show visual feedback
-        if (enabled !== isRoundEnabled) {
-          setIsRoundEnabled(enabled);
-          
-          // Show dialog if access was revoked during language selection
-          if (!enabled && step === 'language-select') {
-            setDialogMessage("Round 1 access has been revoked by the administrator. Please try again later.");
-            setDialogOpen(true);
-          }
-          
-          // If access was revoked during quiz, handle it
-          if (!enabled && step === 'quiz') {
-            handleRoundDisabled();
-          }
-        }
-      }, 5000); // Check every 5 seconds
+    // If access status changed, show visual feedback
+    if (enabled !== isRoundEnabled) {
+      setIsRoundEnabled(enabled);
+      
+      // Show dialog if access was revoked during language selection
+      if (!enabled && step === 'language-select') {
+        setDialogMessage("Round 1 access has been revoked by the administrator. Please try again later.");
+        setDialogOpen(true);
+      }
+      
+      // If access was revoked during quiz, handle it
+      if (!enabled && step === 'quiz') {
+        handleRoundDisabled();
+      }
     }
-    
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [step, user, isRoundEnabled]);
+  };
+  
+  useLiveEvents(user?.id, { round_access: applyRoundAccess }, {
+    active: (step === 'language-select' || step === 'quiz') && Boolean(user) && !user.is_admin,
+    pollers: { round_access: fetchRoundsAccess }
+  });
 
-  // Start polling for round access status when in quiz mode
+  // Check round access once when the quiz starts; later changes arrive above
   useEffect(() => {
-    let intervalId;
-    
     if (step === 'quiz') {
-      // Initial check
       checkRoundAccess().then(enabled => {
         setIsRoundEnabled(enabled);
         
@@ -96,22 +88,7 @@ const Round1 = () => {
           handleRoundDisabled();
         }
       });
-      
-      // Set up polling
-      intervalId = setInterval(async () => {
-        const enabled = await checkRoundAccess();
-        setIsRoundEnabled(enabled);
-        
-        if (!enabled && user && !user.is_admin) {
-          // Round was disabled, auto-submit
-          handleRoundDisabled();
-        }
-      }, 10000); // Check every 10 seconds
     }
-    
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
   }, [step, user]);
 
   // Check if round is still enabled
@@ -148,7 +125,7 @@ const Round1 = () => {
   useEffect(() => {
     if (step === 'quiz' && selectedLanguage) {
       setLoading(true);
-      axios.get(`${apiUrl}/api/admin/questions/${selectedLanguage}`)
+      axios.get(`${apiUrl}/api/admin/questions/${selectedLanguage}`, { params: { user_id: user?.id } })
         .then(response => {
           setQuestions(response.data);
           setLoading(false);
@@ -278,6 +255,9 @@ const Round1 = () => {
         localStorage.setItem('user', JSON.stringify(response.data.updated_user));
         setUser(response.data.updated_user);
       }
+      if (response.data.token) {
+        localStorage.setItem('session_token', response.data.token);
+      }
 
       setStep('results');
       setScore(finalScore);
@@ -302,6 +282,7 @@ const Round1 = () => {
         setDialogMessage('User not found. Please log in again.');
         setTimeout(() => {
           localStorage.removeItem('user');
+          localStorage.removeItem('session_token');
           navigate('/login');
         }, 2000);
       } else {
@@ -9,6 +9,7 @@ import {
 } from '@mui/material';
 import axios from 'axios';
 import Navbar from './Navbar';
+import { fetchRoundsAccess, useLiveEvents } from '../liveEvents';
 import CodeIcon from '@mui/icons-material/Code';
 import PythonIcon from '@mui/icons-material/IntegrationInstructions';
 
@@ -32,6 +33,40 @@ const getImageUrl = (imagePath) => {
   return `${apiUrl}/${imagePath}`;
 };
 
+// Resolve each URL in a "path 480w, path 960w" srcset the same way
+const getImageSrcSet = (srcset) => {
+  if (!srcset) return undefined;
+  return srcset
+    .split(', ')
+    .map((candidate) => {
+      const [path, descriptor] = candidate.split(' ');
+      return `${getImageUrl(path)} ${descriptor}`;
+    })
+    .join(', ');
+};
+
+// Offset of a region inside the sheet as a background-position percentage
+const spriteOffset = (offset, size, total) => (total > size ? (offset / (total - size)) * 100 : 0);
+
+// Crop one image out of a question's sprite sheet with CSS, shown at most at its natural size
+const SpriteImage = ({ sprite, region, maxHeight, alt, style }) => (
+  <Box
+    role="img"
+    aria-label={alt}
+    sx={{
+      display: 'inline-block',
+      verticalAlign: 'middle',
+      width: `min(100%, ${region.width}px, ${(maxHeight * region.width) / region.height}px)`,
+      aspectRatio: `${region.width} / ${region.height}`,
+      backgroundImage: `url(${getImageUrl(sprite.url)})`,
+      backgroundRepeat: 'no-repeat',
+      backgroundSize: `${(sprite.width / region.width) * 100}% ${(sprite.height / region.height) * 100}%`,
+      backgroundPosition: `${spriteOffset(region.x, region.width, sprite.width)}% ${spriteOffset(region.y, region.height, sprite.height)}%`,
+      ...style
+    }}
+  />
+);
+
 const Round2 = () => {
   const navigate = useNavigate();
   const [user, setUser] = useState(null);
@@ -66,49 +101,32 @@ const Round2 = () => {
     }
   }, [navigate]);
 
-  // Check if round is still enabled
-  const checkRoundAccess = async () => {
-    try {
-      const response = await axios.get(`${apiUrl}/api/rounds/access`);
-      return response.data?.round2?.enabled || false;
-    } catch (error) {
-      console.error('Error checking round access:', error);
-      return false;
-    }
-  };
-
-  // Enhanced polling - check access status even during language selection
-  useEffect(() => {
-    let intervalId;
+  // Access changes before and during the quiz - pushed over live events, polled every
+  // 5 seconds when the stream is unavailable
+  const applyRoundAccess = (access) => {
+    const enabled = access?.round2?.enabled || false;
     
-    // Only poll if on language selection screen or during quiz
-    if ((step === 'language-select' || step === 'intro' || step === 'quiz') && user && !user.is_admin) {
-      // Set up polling
-      intervalId = setInterval(async () => {
-        const enabled = await checkRoundAccess();
-        
-        // If access status changed, show visual feedback
-        if (enabled !== isRoundEnabled) {
-          setIsRoundEnabled(enabled);
-          
-          // Show dialog if access was revoked during language selection
-          if (!enabled && (step === 'language-select' || step === 'intro')) {
-            setDialogMessage("Round 2 access has been revoked by the administrator. Please try again later.");
-            setDialogOpen(true);
-          }
-          
-          // If access was revoked during quiz, handle it
-          if (!enabled && step === 'quiz') {
-            handleRoundDisabled();
-          }
-        }
-      }, 5000); // Check every 5 seconds
+    // If access status changed, show visual feedback
+    if (enabled !== isRoundEnabled) {
+      setIsRoundEnabled(enabled);
+      
+      // Show dialog if access was revoked during language selection
+      if (!enabled && (step === 'language-select' || step === 'intro')) {
+        setDialogMessage("Round 2 access has been revoked by the administrator. Please try again later.");
+        setDialogOpen(true);
+      }
+      
+      // If access was revoked during quiz, handle it
+      if (!enabled && step === 'quiz') {
+        handleRoundDisabled();
+      }
     }
-    
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [step, user, isRoundEnabled]);
+  };
+  
+  useLiveEvents(user?.id, { round_access: applyRoundAccess }, {
+    active: (step === 'language-select' || step === 'intro' || step === 'quiz') && Boolean(user) && !user.is_admin,
+    pollers: { round_access: fetchRoundsAccess }
+  });
 
   // Handle round being disabled during participation
   const handleRoundDisabled = () => {
@@ -131,7 +149,7 @@ const Round2 = () => {
     if (user && step === 'quiz' && selectedLanguage) {
       setLoading(true);
       // Use the quiz-specific endpoint for participants, which has better image path handling
-      axios.get(`${apiUrl}/api/quiz/round2?language=${selectedLanguage}`)
+      axios.get(`${apiUrl}/api/quiz/round2?language=${selectedLanguage}&user_id=${user.id}`)
         .then(response => {
           console.log(`Round 2 ${selectedLanguage} questions loaded:`, response.data);
           setQuestions(response.data);
@@ -220,6 +238,9 @@ const Round2 = () => {
         localStorage.setItem('user', JSON.stringify(response.data.updated_user));
         setUser(response.data.updated_user);
       }
+      if (response.data.token) {
+        localStorage.setItem('session_token', response.data.token);
+      }
 
       // Only show completion message if not auto-submitted due to access revocation
       if (!isAutoSubmit) {
@@ -673,10 +694,22 @@ const Round2 = () => {
             </Typography>
             
             {/* Question Image */}
-            {question.questionImage && (
+            {question.questionImage && question.sprite && question.sprite.question ? (
+              <Box sx={{ mb: 3, textAlign: 'center' }}>
+                <SpriteImage
+                  sprite={question.sprite}
+                  region={question.sprite.question}
+                  maxHeight={250}
+                  alt={`Question ${questionIndex + 1}`}
+                  style={{ border: '1px solid rgba(0, 0, 0, 0.1)', borderRadius: '8px' }}
+                />
+              </Box>
+            ) : question.questionImage && (
               <Box sx={{ mb: 3, textAlign: 'center' }}>
                 <img 
                   src={getImageUrl(question.questionImage)}
+                  srcSet={getImageSrcSet(question.questionImageSrcset)}
+                  sizes="(max-width: 960px) 100vw, 960px"
                   alt={`Question ${questionIndex + 1}`}
                   style={{ 
                     maxWidth: '100%', 
@@ -726,10 +759,22 @@ const Round2 = () => {
                             <Typography sx={{ color: 'text.primary', fontSize: '1rem' }}>
                               {option}
                             </Typography>
-                            {question.optionImages && question.optionImages[optionIndex] && (
+                            {question.optionImages && question.optionImages[optionIndex] && question.sprite && question.sprite.options[optionIndex] ? (
+                              <Box sx={{ mt: 1, width: '100%', textAlign: 'center' }}>
+                                <SpriteImage
+                                  sprite={question.sprite}
+                                  region={question.sprite.options[optionIndex]}
+                                  maxHeight={150}
+                                  alt={`Option ${optionIndex + 1}`}
+                                  style={{ border: '1px solid rgba(0, 0, 0, 0.1)', borderRadius: '4px' }}
+                                />
+                              </Box>
+                            ) : question.optionImages && question.optionImages[optionIndex] && (
                               <Box sx={{ mt: 1, width: '100%', textAlign: 'center' }}>
                                 <img 
                                   src={getImageUrl(question.optionImages[optionIndex])}
+                                  srcSet={getImageSrcSet(question.optionImageSrcsets && question.optionImageSrcsets[optionIndex])}
+                                  sizes="(max-width: 900px) 100vw, 480px"
                                   alt={`Option ${optionIndex + 1}`}
                                   style={{ 
                                     maxWidth: '100%', 
@@ -49,7 +49,7 @@ const Round3 = () => {
   useEffect(() => {
     if (user) {
       setLoading(true);
-      axios.get(`${apiUrl}/api/admin/questions/round3`)
+      axios.get(`${apiUrl}/api/admin/questions/round3?user_id=${user.id}`)
         .then(response => {
           console.log("Round 3 questions loaded:", response.data);
           setQuestions(response.data);
@@ -193,6 +193,9 @@ const Round3 = () => {
         localStorage.setItem('user', JSON.stringify(response.data.updated_user));
         setUser(response.data.updated_user);
       }
+      if (response.data.token) {
+        localStorage.setItem('session_token', response.data.token);
+      }
 
       setDialogMessage(`Quiz completed! Your score: ${finalScore}/${Math.min(totalQuestions, questions.length)}`);
       setDialogOpen(true);
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
 import {
   Box,
@@ -23,6 +23,7 @@ import {
 import { dsaProblems } from '../data/dsaProblems';
 import axios from 'axios';
 import Navbar from './Navbar';
+import { fetchRoundsAccess, useLiveEvents } from '../liveEvents';
 
 const Round3DSA = () => {
   const navigate = useNavigate();
@@ -44,6 +45,8 @@ const Round3DSA = () => {
   const [waitingForAccess, setWaitingForAccess] = useState(false);
   const [accessChecked] = useState(false);
   const [isAccessDisabledAlert, setIsAccessDisabledAlert] = useState(false);
+  // Set once access is revoked, so a repeated event does not submit twice
+  const revokedRef = useRef(false);
   
   // Initialize with default template based on language
   const templates = {
@@ -156,100 +159,127 @@ const Round3DSA = () => {
     checkAccess();
   }, [navigate, problemId, language]);
 
-  // Polling for round access when waiting
-  useEffect(() => {
-    let intervalId;
+  // Round 3 access changes - pushed over live events, polled every 5 seconds when the
+  // stream is unavailable
+  const applyRoundAccess = async (access) => {
+    const enabled = access?.round3?.enabled || false;
     
     if (waitingForAccess) {
-      intervalId = setInterval(async () => {
-        const isEnabled = await checkRoundAccess();
-        if (isEnabled) {
-          setWaitingForAccess(false);
-          setRoundEnabled(true);
-          
-          // Load problem once access is granted
-          if (problemId && problemId > 0 && problemId <= dsaProblems.length) {
-            setProblem(dsaProblems[problemId - 1]);
-            setCode(templates[language]);
-          } else {
-            navigate('/round3/dsa/1');
-          }
-          
-          setSnackbar({
-            open: true,
-            message: 'Round 3 access granted! You can now participate.',
-            severity: 'success'
-          });
+      if (enabled) {
+        setWaitingForAccess(false);
+        setRoundEnabled(true);
+        
+        // Load problem once access is granted
+        if (problemId && problemId > 0 && problemId <= dsaProblems.length) {
+          setProblem(dsaProblems[problemId - 1]);
+          setCode(templates[language]);
+        } else {
+          navigate('/round3/dsa/1');
         }
-      }, 10000); // Check every 10 seconds
+        
+        setSnackbar({
+          open: true,
+          message: 'Round 3 access granted! You can now participate.',
+          severity: 'success'
+        });
+      }
+      return;
     }
     
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [waitingForAccess, problemId, language, navigate]);
-
-  // Enhanced access check polling - will auto-submit and redirect when access is revoked
-  useEffect(() => {
-    if (waitingForAccess || !problem) return;
+    if (enabled) {
+      revokedRef.current = false;
+      // If access status changed to enabled
+      if (!roundEnabled) {
+        setRoundEnabled(true);
+        setSnackbar({
+          open: true,
+          message: 'Round 3 is now enabled! You can submit your solutions.',
+          severity: 'success'
+        });
+      }
+      return;
+    }
     
-    let intervalId;
+    if (JSON.parse(localStorage.getItem('user')).is_admin || revokedRef.current) return;
+    revokedRef.current = true;
     
-    // Only set up polling if we're not waiting for access and we have a problem loaded
-    intervalId = setInterval(async () => {
-      const isEnabled = await checkRoundAccess();
+    // Access was revoked: show alert and prepare for redirect
+    if (roundEnabled && !accessChecked) {
+      setRoundEnabled(false);
+      setIsAccessDisabledAlert(true);
       
-      if (!isEnabled && !JSON.parse(localStorage.getItem('user')).is_admin) {
-        // Round access was revoked while the participant was solving a problem
-        clearInterval(intervalId);
-        
-        // Show notification
-        setSnackbar({
-          open: true,
-          message: 'Round 3 access has been revoked by the administrator. Your solution will be submitted for scoring.',
+      // After 5 seconds, redirect to dashboard
+      setTimeout(() => {
+        navigate('/participant-dashboard', { state: { 
+          message: 'Round 3 access has been revoked by the administrator.',
           severity: 'warning'
+        }});
+      }, 5000);
+    }
+    
+    // Auto-submit and redirect if the participant was solving a problem
+    if (!problem) return;
+    
+    // Show notification
+    setSnackbar({
+      open: true,
+      message: 'Round 3 access has been revoked by the administrator. Your solution will be submitted for scoring.',
+      severity: 'warning'
+    });
+    
+    try {
+      // Auto-submit the current solution with scoring
+      if (code && code.trim() !== templates[language]) {
+        const submitResponse = await axios.post('/api/round3/submit-dsa', {
+          user_id: JSON.parse(localStorage.getItem('user')).id,
+          challenge_id: parseInt(problemId),
+          challenge_name: problem.title,
+          code: code,
+          language: language
         });
         
-        try {
-          // Auto-submit the current solution with scoring
-          if (code && code.trim() !== templates[language]) {
-            const submitResponse = await axios.post('/api/round3/submit-dsa', {
-              user_id: JSON.parse(localStorage.getItem('user')).id,
-              challenge_id: parseInt(problemId),
-              challenge_name: problem.title,
-              code: code,
-              language: language
-            });
-            
-            // Show score notification if response includes score info
-            if (submitResponse.data && submitResponse.data.score !== undefined) {
-              setSnackbar({
-                open: true,
-                message: `Solution submitted and scored: ${submitResponse.data.score} points. ${submitResponse.data.qualified_for_next ? 'You have qualified for the next round!' : ''}`,
-                severity: 'info'
-              });
-            }
-          }
-        } catch (error) {
-          console.error("Error auto-submitting solution:", error);
+        // Show score notification if response includes score info
+        if (submitResponse.data && submitResponse.data.score !== undefined) {
           setSnackbar({
             open: true,
-            message: 'Error submitting your solution. Your progress may not be saved.',
-            severity: 'error'
+            message: `Solution submitted and scored: ${submitResponse.data.score} points. ${submitResponse.data.qualified_for_next ? 'You have qualified for the next round!' : ''}`,
+            severity: 'info'
           });
         }
-        
-        // Redirect back to dashboard
-        setTimeout(() => {
-          navigate('/participant-dashboard');
-        }, 3000);
       }
-    }, 5000);
+    } catch (error) {
+      console.error("Error auto-submitting solution:", error);
+      setSnackbar({
+        open: true,
+        message: 'Error submitting your solution. Your progress may not be saved.',
+        severity: 'error'
+      });
+    }
     
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [waitingForAccess, problem, templates, language, navigate, code]);
+    // Redirect back to dashboard
+    setTimeout(() => {
+      navigate('/participant-dashboard');
+    }, 3000);
+  };
+  
+  // An admin reviewed one of this participant's DSA submissions
+  const handleSubmissionScored = (submission) => {
+    if (submission.track_type !== 'dsa') return;
+    setSnackbar({
+      open: true,
+      message: `Your solution for problem ${submission.challenge_id} has been reviewed.`,
+      severity: 'info'
+    });
+  };
+  
+  const storedUser = JSON.parse(localStorage.getItem('user') || 'null');
+  useLiveEvents(storedUser?.id, {
+    round_access: applyRoundAccess,
+    submission_scored: handleSubmissionScored
+  }, {
+    active: !loading,
+    pollers: { round_access: fetchRoundsAccess }
+  });
 
   useEffect(() => {
     // Reset code when language changes
@@ -353,45 +383,6 @@ const Round3DSA = () => {
     navigate('/participant-dashboard');
   };
 
-  // Start polling for round access status
-  useEffect(() => {
-    let intervalId;
-    
-    if (roundEnabled && !waitingForAccess && !accessChecked) {
-      // Set up polling
-      intervalId = setInterval(async () => {
-        const enabled = await checkRoundAccess();
-        
-        // If access status changed to disabled, show alert and prepare for redirect
-        if (roundEnabled && !enabled) {
-          setRoundEnabled(false);
-          setIsAccessDisabledAlert(true);
-          
-          // After 5 seconds, redirect to dashboard
-          setTimeout(() => {
-            navigate('/participant-dashboard', { state: { 
-              message: 'Round 3 access has been revoked by the administrator.',
-              severity: 'warning'
-            }});
-          }, 5000);
-        }
-        // If access status changed to enabled
-        else if (!roundEnabled && enabled) {
-          setRoundEnabled(true);
-          setSnackbar({
-            open: true,
-            message: 'Round 3 is now enabled! You can submit your solutions.',
-            severity: 'success'
-          });
-        }
-      }, 5000); // Check every 5 seconds
-    }
-    
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [roundEnabled, waitingForAccess, accessChecked, navigate]);
-
   if (loading) {
     return (
       <Box sx={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '80vh' }}>
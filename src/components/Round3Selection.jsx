@@ -24,6 +24,7 @@ import {
 } from '@mui/material';
 import axios from 'axios';
 import Navbar from './Navbar';
+import { fetchRoundsAccess, useLiveEvents } from '../liveEvents';
 import CodeIcon from '@mui/icons-material/Code';
 import WebIcon from '@mui/icons-material/Web';
 
@@ -39,7 +40,6 @@ const Round3Selection = () => {
     dsa: [],
     web: []
   });
-  const [accessPolling, setAccessPolling] = useState(null);
 
   // Load user from localStorage and check permissions
   useEffect(() => {
@@ -65,13 +65,6 @@ const Round3Selection = () => {
     }
     
     setLoading(false);
-    
-    return () => {
-      // Clear polling interval on unmount
-      if (accessPolling) {
-        clearInterval(accessPolling);
-      }
-    };
   }, [navigate]);
   
   // Fetch completed problems for this user
@@ -111,22 +104,33 @@ const Round3Selection = () => {
     }
   };
   
-  // Start polling for round access status
+  // Round access: checked once, then pushed over live events, or polled every 5 seconds
+  // when the stream is unavailable
   useEffect(() => {
-    // Initial check
     checkRoundAccess();
-    
-    // Set up polling
-    const intervalId = setInterval(() => {
-      checkRoundAccess();
-    }, 5000); // Check every 5 seconds
-    
-    setAccessPolling(intervalId);
-    
-    return () => {
-      clearInterval(intervalId);
-    };
   }, []);
+  
+  // A qualification pass can take this participant out of Round 3
+  const handleQualifications = async () => {
+    try {
+      const response = await axios.get(`/api/user/${user.id}`, {
+        params: { requesting_user_id: user.id }
+      });
+      if (!response.data.qualified_for_round3 && !response.data.is_admin) {
+        navigate('/participant-dashboard');
+      }
+    } catch (error) {
+      console.error('Error refreshing qualification status:', error);
+    }
+  };
+  
+  useLiveEvents(user?.id, {
+    round_access: (access) => {
+      setAccessChecked(true);
+      setIsRoundEnabled(access?.round3?.enabled || false);
+    },
+    qualifications: handleQualifications
+  }, { pollers: { round_access: fetchRoundsAccess } });
 
   // Check if round is enabled
   const checkRoundAccess = async () => {
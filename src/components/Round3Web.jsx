@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import {
   Box,
@@ -22,6 +22,7 @@ import {
 } from '@mui/material';
 import axios from 'axios';
 import Navbar from './Navbar';
+import { fetchRoundsAccess, useLiveEvents } from '../liveEvents';
 import { webChallenges } from '../data/webChallenges';
 
 // Function to submit challenge (real implementation)
@@ -107,6 +108,8 @@ const Round3Web = () => {
   const [roundEnabled, setRoundEnabled] = useState(false);
   const [waitingForAccess, setWaitingForAccess] = useState(false);
   const [isAccessDisabledAlert, setIsAccessDisabledAlert] = useState(false);
+  // Set once access is revoked, so a repeated event does not submit twice
+  const revokedRef = useRef(false);
 
   // Function to check if Round 3 is enabled
   const checkRoundAccess = async () => {
@@ -215,133 +218,156 @@ const Round3Web = () => {
     checkAccess();
   }, [navigate]);
 
-  // Polling for round access when waiting
-  useEffect(() => {
-    let intervalId;
+  // Round 3 access changes - pushed over live events, polled every 5 seconds when the
+  // stream is unavailable
+  const applyRoundAccess = async (access) => {
+    const enabled = access?.round3?.enabled || false;
     
     if (waitingForAccess) {
-      intervalId = setInterval(async () => {
-        const isEnabled = await checkRoundAccess();
-        if (isEnabled) {
-          setWaitingForAccess(false);
-          setRoundEnabled(true);
-          
-          // Load challenges once access is granted
-          try {
-            const userId = JSON.parse(localStorage.getItem('user')).id;
-            const response = await axios.get(`/api/round3/submissions?user_id=${userId}&track_type=web`);
-            if (response.data && response.data.submissions) {
-              const completed = response.data.submissions.map(sub => parseInt(sub.challenge_id));
-              setCompletedChallenges(completed);
-              
-              if (completed.length === webChallenges.length && completed.length > 0) {
-                setOpenDialog(true);
-              } else if (completed.length > 0) {
-                // Find the first uncompleted challenge
-                for (let i = 0; i < webChallenges.length; i++) {
-                  if (!completed.includes(webChallenges[i].id)) {
-                    selectChallenge(i);
-                    break;
-                  }
+      if (enabled) {
+        setWaitingForAccess(false);
+        setRoundEnabled(true);
+        
+        // Load challenges once access is granted
+        try {
+          const userId = JSON.parse(localStorage.getItem('user')).id;
+          const response = await axios.get(`/api/round3/submissions?user_id=${userId}&track_type=web`);
+          if (response.data && response.data.submissions) {
+            const completed = response.data.submissions.map(sub => parseInt(sub.challenge_id));
+            setCompletedChallenges(completed);
+            
+            if (completed.length === webChallenges.length && completed.length > 0) {
+              setOpenDialog(true);
+            } else if (completed.length > 0) {
+              // Find the first uncompleted challenge
+              for (let i = 0; i < webChallenges.length; i++) {
+                if (!completed.includes(webChallenges[i].id)) {
+                  selectChallenge(i);
+                  break;
                 }
-              } else {
-                selectChallenge(0);
               }
             } else {
               selectChallenge(0);
             }
-          } catch (error) {
-            console.error('Error fetching completed challenges:', error);
+          } else {
             selectChallenge(0);
           }
-          
-          setSnackbar({
-            open: true,
-            message: 'Round 3 access granted! You can now participate.',
-            severity: 'success'
-          });
+        } catch (error) {
+          console.error('Error fetching completed challenges:', error);
+          selectChallenge(0);
         }
-      }, 10000); // Check every 10 seconds
+        
+        setSnackbar({
+          open: true,
+          message: 'Round 3 access granted! You can now participate.',
+          severity: 'success'
+        });
+      }
+      return;
     }
     
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [waitingForAccess]);
-
-  // Enhanced access check polling - will auto-submit and redirect when access is revoked
-  useEffect(() => {
-    if (waitingForAccess || submitting) return;
+    if (enabled) {
+      revokedRef.current = false;
+      // If access status changed to enabled
+      if (!roundEnabled) {
+        setRoundEnabled(true);
+        setSnackbar({
+          open: true,
+          message: 'Round 3 is now enabled! You can submit your solutions.',
+          severity: 'success'
+        });
+      }
+      return;
+    }
     
-    let intervalId;
+    if (JSON.parse(localStorage.getItem('user')).is_admin || revokedRef.current) return;
+    revokedRef.current = true;
     
-    // Only set up polling if we're actively working on a challenge
-    intervalId = setInterval(async () => {
-      const isEnabled = await checkRoundAccess();
+    // Access was revoked: show alert and prepare for redirect
+    if (roundEnabled) {
+      setRoundEnabled(false);
+      setIsAccessDisabledAlert(true);
       
-      if (!isEnabled && !JSON.parse(localStorage.getItem('user')).is_admin) {
-        // Round access was revoked while the participant was working on a challenge
-        clearInterval(intervalId);
-        
-        // Show notification
-        setSnackbar({
-          open: true,
-          message: 'Round 3 access has been revoked by the administrator. Your solution will be submitted for scoring.',
+      // After 5 seconds, redirect to dashboard
+      setTimeout(() => {
+        navigate('/participant-dashboard', { state: { 
+          message: 'Round 3 access has been revoked by the administrator.',
           severity: 'warning'
-        });
+        }});
+      }, 5000);
+    }
+    
+    // Auto-submit and redirect if the participant was working on a challenge
+    if (submitting) return;
+    
+    // Show notification
+    setSnackbar({
+      open: true,
+      message: 'Round 3 access has been revoked by the administrator. Your solution will be submitted for scoring.',
+      severity: 'warning'
+    });
+    
+    // Auto-submit the current challenge with scoring
+    try {
+      const challenge = webChallenges[currentChallenge];
+      
+      // Only submit if there's substantial work (non-default content)
+      if ((htmlCode && htmlCode !== challenge.htmlTemplate) || 
+          (cssCode && cssCode !== challenge.cssTemplate) || 
+          (jsCode && jsCode !== challenge.jsTemplate)) {
         
-        // Auto-submit the current challenge with scoring
-        try {
-          const challenge = webChallenges[currentChallenge];
-          
-          // Only submit if there's substantial work (non-default content)
-          if ((htmlCode && htmlCode !== challenge.htmlTemplate) || 
-              (cssCode && cssCode !== challenge.cssTemplate) || 
-              (jsCode && jsCode !== challenge.jsTemplate)) {
-            
-            console.log("Auto-submitting web challenge due to round access revocation");
-            const result = await submitChallenge(
-              challenge.id, 
-              htmlCode, 
-              cssCode, 
-              jsCode, 
-              true // Indicate this is an auto-submission for scoring
-            );
-            
-            // Update completed challenges
-            if (!completedChallenges.includes(challenge.id)) {
-              setCompletedChallenges([...completedChallenges, challenge.id]);
-            }
-            
-            // Show score notification if response includes score info
-            if (result && result.score !== undefined) {
-              setSnackbar({
-                open: true,
-                message: `Solution submitted and scored: ${result.score} points. ${result.qualified_for_next ? 'You have qualified for the next round!' : ''}`,
-                severity: 'info'
-              });
-            }
-          }
-        } catch (error) {
-          console.error("Error auto-submitting challenge:", error);
+        console.log("Auto-submitting web challenge due to round access revocation");
+        const result = await submitChallenge(
+          challenge.id, 
+          htmlCode, 
+          cssCode, 
+          jsCode, 
+          true // Indicate this is an auto-submission for scoring
+        );
+        
+        // Update completed challenges
+        if (!completedChallenges.includes(challenge.id)) {
+          setCompletedChallenges([...completedChallenges, challenge.id]);
+        }
+        
+        // Show score notification if response includes score info
+        if (result && result.score !== undefined) {
           setSnackbar({
             open: true,
-            message: 'Error submitting your solution. Your progress may not be saved.',
-            severity: 'error'
+            message: `Solution submitted and scored: ${result.score} points. ${result.qualified_for_next ? 'You have qualified for the next round!' : ''}`,
+            severity: 'info'
           });
         }
-        
-        // Redirect to dashboard after a short delay
-        setTimeout(() => {
-          navigate('/participant-dashboard');
-        }, 3000);
       }
-    }, 10000); // Check every 10 seconds
+    } catch (error) {
+      console.error("Error auto-submitting challenge:", error);
+      setSnackbar({
+        open: true,
+        message: 'Error submitting your solution. Your progress may not be saved.',
+        severity: 'error'
+      });
+    }
     
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [waitingForAccess, submitting, currentChallenge, htmlCode, cssCode, jsCode, navigate, completedChallenges]);
+    // Redirect to dashboard after a short delay
+    setTimeout(() => {
+      navigate('/participant-dashboard');
+    }, 3000);
+  };
+  
+  // An admin reviewed one of this participant's web submissions
+  const handleSubmissionScored = (submission) => {
+    if (submission.track_type !== 'web') return;
+    setSnackbar({
+      open: true,
+      message: `Your solution for challenge ${submission.challenge_id} has been reviewed.`,
+      severity: 'info'
+    });
+  };
+  
+  useLiveEvents(currentUser?.id, {
+    round_access: applyRoundAccess,
+    submission_scored: handleSubmissionScored
+  }, { pollers: { round_access: fetchRoundsAccess } });
 
   const handleEditorTabChange = (_, newValue) => {
     setEditorTab(newValue);
@@ -483,45 +509,6 @@ const Round3Web = () => {
     navigate('/participant-dashboard');
   };
 
-  // Start polling for round access status
-  useEffect(() => {
-    let intervalId;
-    
-    if (currentUser && !currentUser.is_admin) {
-      // Set up polling
-      intervalId = setInterval(async () => {
-        const enabled = await checkRoundAccess();
-        
-        // If access status changed to disabled, show alert and prepare for redirect
-        if (roundEnabled && !enabled) {
-          setRoundEnabled(false);
-          setIsAccessDisabledAlert(true);
-          
-          // After 5 seconds, redirect to dashboard
-          setTimeout(() => {
-            navigate('/participant-dashboard', { state: { 
-              message: 'Round 3 access has been revoked by the administrator.',
-              severity: 'warning'
-            }});
-          }, 5000);
-        }
-        // If access status changed to enabled
-        else if (!roundEnabled && enabled) {
-          setRoundEnabled(true);
-          setSnackbar({
-            open: true,
-            message: 'Round 3 is now enabled! You can submit your solutions.',
-            severity: 'success'
-          });
-        }
-      }, 5000); // Check every 5 seconds
-    }
-    
-    return () => {
-      if (intervalId) clearInterval(intervalId);
-    };
-  }, [currentUser, roundEnabled, navigate]);
-
   if (loading) {
     return (
       <Box sx={{ display: 'flex', justifyContent: 'center', alignItems: 'center', height: '100vh' }}>
@@ -0,0 +1,81 @@
+import { useEffect, useRef } from 'react';
+import axios from 'axios';
+
+const apiUrl = import.meta.env.VITE_API_URL;
+
+// Subscribe to the backend's Server-Sent Events stream. `handlers` maps event types
+// (round_access, qualifications, submission_scored) to callbacks taking the event data.
+// onUnavailable is called once if the stream cannot be used - no EventSource support,
+// live events disabled on the server, or every stream slot taken - so the caller can
+// poll instead. Returns a function that closes the stream.
+export const subscribeLiveEvents = (userId, handlers, onUnavailable) => {
+    if (!window.EventSource) {
+        onUnavailable();
+        return () => {};
+    }
+
+    const eventSource = new EventSource(`${apiUrl}/api/events/stream?user_id=${userId}`);
+    Object.entries(handlers).forEach(([type, handler]) => {
+        eventSource.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+    });
+
+    let unavailable = false;
+    eventSource.onerror = () => {
+        // While CONNECTING the browser retries on its own; CLOSED means it gave up
+        if (eventSource.readyState === EventSource.CLOSED && !unavailable) {
+            unavailable = true;
+            onUnavailable();
+        }
+    };
+
+    return () => eventSource.close();
+};
+
+// Round access in the shape of the round_access event, for polling
+export const fetchRoundsAccess = async () => {
+    const response = await axios.get(`${apiUrl}/api/rounds/access`);
+    return response.data;
+};
+
+// subscribeLiveEvents for components. Handlers are taken from the latest render, so
+// they see current state, but the stream is only reopened when userId or active
+// changes. `pollers` maps event types to functions fetching the same data; while the
+// stream is unavailable they run every pollInterval ms and feed the matching handler.
+export const useLiveEvents = (userId, handlers, { active = true, pollers = {}, pollInterval = 5000 } = {}) => {
+    const handlersRef = useRef(handlers);
+    const pollersRef = useRef(pollers);
+    useEffect(() => {
+        handlersRef.current = handlers;
+        pollersRef.current = pollers;
+    });
+
+    const types = Object.keys(handlers).join(',');
+    useEffect(() => {
+        if (!userId || !active) return undefined;
+
+        let intervalId;
+        const dispatch = (type, data) => handlersRef.current[type]?.(data);
+        const streamHandlers = {};
+        types.split(',').forEach((type) => {
+            streamHandlers[type] = (data) => dispatch(type, data);
+        });
+
+        const closeStream = subscribeLiveEvents(userId, streamHandlers, () => {
+            intervalId = setInterval(() => {
+                Object.entries(pollersRef.current).forEach(async ([type, poll]) => {
+                    try {
+                        dispatch(type, await poll());
+                    } catch (error) {
+                        // A failed poll says nothing about the state, try again next time
+                        console.error(`Error polling ${type}:`, error);
+                    }
+                });
+            }, pollInterval);
+        });
+
+        return () => {
+            closeStream();
+            if (intervalId) clearInterval(intervalId);
+        };
+    }, [userId, active, types, pollInterval]);
+};
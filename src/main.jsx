@@ -2,6 +2,16 @@ import { StrictMode } from 'react'
 import { createRoot } from 'react-dom/client'
 import './index.css'
 import App from './App.jsx'
+import axios from 'axios'
+
+// Identify the user to the API with the session token issued at login
+axios.interceptors.request.use((config) => {
+  const token = localStorage.getItem('session_token')
+  if (token) {
+    config.headers.Authorization = `Bearer ${token}`
+  }
+  return config
+})
 
 createRoot(document.getElementById('root')).render(
   <StrictMode>